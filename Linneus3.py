@@ -10,16 +10,56 @@
 # There is a corresponding inverse dictionary, INCLUDES.
 # Each entry in the ISA dictionary is of the form
 #  ('turtle' : ['reptile', 'shelled-creature'])
+# Every name is interned as it is stored, so however many facts mention
+# a category, its name is held in memory once.
 
 from re import *   # Loads the regular expression module.
+from collections import namedtuple, OrderedDict
+import sys
+from snapshot import save_snapshot, load_snapshot
+from journal import open_journal
+from instrument import attach
+import hierarchy
+import console
 
 ISA = {}
 INCLUDES = {}
 ARTICLES = {}
 
+# While a batch is open, assertions are stored without being indexed or
+# checked for redundancy; this dictionary counts what happened to them.
+batch = None
+
+# When a journal is open (see journal.py), every change to the
+# dictionaries above is also logged to it.
+journal = None
+
+# When instruments are attached (see instrument.py), every command and
+# every search is measured by them.
+instruments = None
+
+# Answers already given (see hierarchy.cached_answer), least recently
+# used first, each with the generation it was worked out in. Every change
+# to the knowledge base starts a new generation, and CHANGED records the
+# last generation in which each category changed.
+ANSWERS = OrderedDict()
+CHANGED = {}
+generation = 0
+
+# The reachability index over ISA (see hierarchy.py).
+ANCESTORS = {}
+BITS = {}
+BIT_NAMES = []
+
+# This module: the knowledge base, as hierarchy.py, snapshot.py and the
+# other modules that work on it are given it.
+kb = sys.modules[__name__]
+
 def store_isa_fact(category1, category2):
     'Stores one fact of the form A BIRD IS AN ANIMAL'
     # That is, a member of CATEGORY1 is a member of CATEGORY2
+    category1 = sys.intern(category1)
+    category2 = sys.intern(category2)
     try :
         c1list = ISA[category1]
         c1list.append(category2)
@@ -30,257 +70,432 @@ def store_isa_fact(category1, category2):
         c2list.append(category1)
     except KeyError :
         INCLUDES[category2] = [category1]
+    hierarchy.touch(kb, category1)
+    if batch is None:
+        hierarchy.index_isa_fact(kb, category1, category2)
+    else:
+        batch['touched'].add(category1)
+    if journal is not None:
+        journal.append('isa', category1, category2)
+
+def remove_isa_fact(category1, category2, uninclude = True):
+    """
+    Removes one fact of the form A BIRD IS AN ANIMAL. If UNINCLUDE is
+    False, CATEGORY1 is left on the INCLUDES list of CATEGORY2 for the
+    caller to take off (see hierarchy.remove_redundant_facts).
+    """
+    ISA[category1].remove(category2)
+    if uninclude: INCLUDES[category2].remove(category1)
+    hierarchy.touch(kb, category1)
+    if journal is not None:
+        journal.append('remove', category1, category2)
+    hierarchy.unindex_isa_fact(kb, category1, category2)
         
 def get_isa_list(category1):
     'Retrieves any existing list of things that CATEGORY1 is a'
-    try:
-        c1list = ISA[category1]
-        return c1list
-    except:
-        return []
+    return hierarchy.get_isa_list(kb, category1)
     
 def get_includes_list(category1):
     'Retrieves any existing list of things that CATEGORY1 includes'
-    try:
-        c1list = INCLUDES[category1]
-        return c1list
-    except:
-        return []
+    return hierarchy.get_includes_list(kb, category1)
     
 def isa_test1(category1, category2):
     'Returns True if category 2 is (directly) on the list for category 1.'
-    c1list = get_isa_list(category1)
-    return c1list.__contains__(category2)
+    return category2 in get_isa_list(category1)
     
-def isa_test(category1, category2, depth_limit = 10):
-    'Returns True if category 1 is a subset of category 2 within depth_limit levels'
-    if category1 == category2 : return True
-    if isa_test1(category1, category2) : return True
-    if depth_limit < 2 : return False
-    for intermediate_category in get_isa_list(category1):
-        if isa_test(intermediate_category, category2, depth_limit - 1):
-            return True
-    return False
+def isa_test(category1, category2):
+    'Returns True if category 1 is a subset of category 2'
+    return hierarchy.isa_test(kb, category1, category2)
+
+def common_ancestors(categories):
+    'Returns the most specific categories that every one of CATEGORIES is, in alphabetical order.'
+    return hierarchy.common_ancestors(kb, categories)
+
+def forget_answers():
+    'Forgets every answer in ANSWERS, as when the whole knowledge base is replaced.'
+    hierarchy.forget_answers(kb)
 
 def store_article(noun, article):
     'Saves the article (in lower-case) associated with a noun.'
-    ARTICLES[noun] = article.lower()
+    hierarchy.store_article(kb, noun, article)
 
 def get_article(noun):
     'Returns the article associated with the noun, or if none, the empty string.'
-    try:
-        article = ARTICLES[noun]
-        return article
-    except KeyError:
-        return ''
+    return hierarchy.get_article(kb, noun)
 
 def linneus():
     'The main loop; it gets and processes user input, until "bye".'
-    print('This is Linneus.  Please tell me "ISA" facts and ask questions.')
-    print('For example, you could tell me "An ant is an insect."')
-    while True :
-        info = input('Enter an ISA fact, or "bye" here: ')
-        if info == 'bye': return 'Goodbye now!'
-        process(info)
+    return console.linneus(kb)
 
 # Some regular expressions used to parse the user sentences:    
 # assertion_pattern: "A [category1] is a [category2]."
 # query_pattern: "Is a [category1] a [category2]?"
 # what_pattern: "What is a [category]?"
+# fully_pattern: "What is a [category], fully?"
+# kinds_pattern: "What are all the kinds of [category]?"
+# more_pattern: "More."
 # why_pattern: "Why is a [category1] a [category2]?"
+# minimize_pattern: "Minimize the knowledge base."
+# begin_batch_pattern: "Begin a batch."
+# commit_batch_pattern: "Commit the batch."
+# save_pattern: "Save the knowledge base to [filename]."
+# load_pattern: "Load the knowledge base from [filename]."
+# journal_pattern: "Keep a journal in [filename]."
+# compact_pattern: "Compact the journal."
+# keep_statistics_pattern: "Keep statistics."
+# show_statistics_pattern: "Show the statistics."
 assertion_pattern = compile(r"^(a|an|A|An)\s+([-\w]+)\s+is\s+(a|an)\s+([-\w]+)(\.|\!)*$", IGNORECASE)    
 query_pattern = compile(r"^is\s+(a|an)\s+([-\w]+)\s+(a|an)\s+([-\w]+)(\?\.)*", IGNORECASE)    
 what_pattern = compile(r"^What\s+is\s+(a|an)\s+([-\w]+)(\?\.)*", IGNORECASE)    
+fully_pattern = compile(r"^What\s+is\s+(a|an)\s+([-\w]+),?\s+fully(\?|\.)*$", IGNORECASE)
+kinds_pattern = compile(r"^What\s+are\s+all\s+the\s+kinds\s+of\s+([-\w]+)(\?|\.)*$", IGNORECASE)
+more_pattern = compile(r"^More(\.|\?|\!)*$", IGNORECASE)
+common_pattern = compile(r"^What\s+do\s+((a|an)\s+[-\w]+((,|,?\s+and)\s+(a|an)\s+[-\w]+)+)\s+have\s+in\s+common(\?|\.)*$", IGNORECASE)
+named_category_pattern = compile(r"\b(a|an)\s+([-\w]+)", IGNORECASE)
 why_pattern = compile(r"^Why\s+is\s+(a|an)\s+([-\w]+)\s+(a|an)\s+([-\w]+)(\?\.)*", IGNORECASE)    
+minimize_pattern = compile(r"^Minimize(\s+the\s+knowledge\s+base)?(\.|\!)*$", IGNORECASE)
+begin_batch_pattern = compile(r"^Begin(\s+a)?\s+batch(\.|\!)*$", IGNORECASE)
+commit_batch_pattern = compile(r"^Commit(\s+the)?\s+batch(\.|\!)*$", IGNORECASE)
+save_pattern = compile(r"^Save\s+the\s+knowledge\s+base\s+to\s+(\S+?)(\.|\!)*$", IGNORECASE)
+load_pattern = compile(r"^Load\s+the\s+knowledge\s+base\s+from\s+(\S+?)(\.|\!)*$", IGNORECASE)
+journal_pattern = compile(r"^Keep\s+a\s+journal\s+in\s+(\S+?)(\.|\!)*$", IGNORECASE)
+compact_pattern = compile(r"^Compact\s+the\s+journal(\.|\!)*$", IGNORECASE)
+keep_statistics_pattern = compile(r"^Keep\s+statistics(\.|\!)*$", IGNORECASE)
+show_statistics_pattern = compile(r"^Show(\s+the)?\s+statistics(\.|\!)*$", IGNORECASE)
 
-skip = ""
-def get_terminating_chains(start, endlist, templist):
-    if get_isa_list(start):
-        global skip
-        if start != skip:
-            for intermediate_category in get_isa_list(start):
-                templist.append(intermediate_category)
-                get_terminating_chains(intermediate_category, endlist, templist)
-                templist.pop()
-    else:
+# Each pattern above, in the order they are tried, with the first words
+# that a sentence it matches can begin with. Only the patterns for the
+# first word of a sentence are ever tried on it.
+COMMAND_PATTERNS = [
+    ('assertion', assertion_pattern, ['a', 'an']),
+    ('commit_batch', commit_batch_pattern, ['commit']),
+    ('begin_batch', begin_batch_pattern, ['begin']),
+    ('query', query_pattern, ['is']),
+    ('fully', fully_pattern, ['what']),
+    ('what', what_pattern, ['what']),
+    ('kinds', kinds_pattern, ['what']),
+    ('common', common_pattern, ['what']),
+    ('more', more_pattern, ['more']),
+    ('why', why_pattern, ['why']),
+    ('minimize', minimize_pattern, ['minimize']),
+    ('save', save_pattern, ['save']),
+    ('load', load_pattern, ['load']),
+    ('journal', journal_pattern, ['keep']),
+    ('compact', compact_pattern, ['compact']),
+    ('keep_statistics', keep_statistics_pattern, ['keep']),
+    ('show_statistics', show_statistics_pattern, ['show']),
+]
+
+def commands_by_word():
+    'Returns a dictionary from each first word to the (kind, pattern) pairs worth trying.'
+    table = {}
+    for kind, pattern, words in COMMAND_PATTERNS:
+        for word in words:
+            table.setdefault(word, []).append((kind, pattern))
+    return table
+
+COMMANDS_BY_WORD = commands_by_word()
+
+# A parsed sentence: KIND names the pattern it matched ('unknown' if
+# none did), ITEMS holds the groups of that match, and TEXT is the
+# sentence itself.
+Command = namedtuple('Command', ['kind', 'items', 'text'])
+
+def parse_command(info):
+    'Classifies the user sentence by its first word and returns a Command.'
+    words = info.split(None, 1)
+    if words != []:
+        for kind, pattern in COMMANDS_BY_WORD.get(words[0].rstrip('?.!').lower(), []):
+            result_match_object = pattern.match(info)
+            if result_match_object != None :
+                return Command(kind, result_match_object.groups(), info)
+    return Command('unknown', (), info)
+
+def get_terminating_chains(start, endlist, templist, skip = None):
+    'Appends to ENDLIST every chain from START up to a category with no supercategory.'
+    if not get_isa_list(start):
         endlist.append(list(templist))
+        return
+    if start == skip: return
+    # The stack holds, for START and each category on the chain so far,
+    # the supercategories of it still to be tried. A category already on
+    # the chain is not tried again, so a cycle is never walked twice.
+    chain = list(templist)
+    on_chain = {start}
+    stack = [iter(get_isa_list(start))]
+    while stack:
+        category = next(stack[-1], None)
+        if category is None:
+            stack.pop()
+            if stack: on_chain.discard(chain.pop())
+        elif category in on_chain:
+            continue
+        elif not get_isa_list(category):
+            endlist.append(chain + [category])
+        elif category != skip:
+            chain.append(category)
+            on_chain.add(category)
+            stack.append(iter(get_isa_list(category)))
+
+def find_redundant_facts(category1, category2):
+    'Returns the earlier links made redundant by the new fact that a CATEGORY1 is a CATEGORY2.'
+    # Only the direct supercategories of CATEGORY1 and of everything
+    # below it can have become redundant, and only those that CATEGORY2
+    # (or CATEGORY2 itself) is a member of. A link is only implied by
+    # another from the same category, so categories with one are passed over.
+    new_ancestors = set(hierarchy.get_ancestors(kb, category2))
+    new_ancestors.add(category2)
+    redundant = []
+    affected = [category1]
+    seen = {category1}
+    for category in affected:
+        parents = ISA.get(category, ())
+        if len(parents) > 1:
+            for parent in parents:
+                if category == category1 and parent == category2: continue
+                if parent in new_ancestors and hierarchy.redundant_isa_fact(kb, category, parent):
+                    redundant.append([category, parent])
+        for subcategory in INCLUDES.get(category, ()):
+            if subcategory not in seen:
+                seen.add(subcategory)
+                affected.append(subcategory)
+    return redundant
+
+def minimize_knowledge_base():
+    'Removes every stored fact that the others imply; returns the links removed.'
+    # Dropping one implied link leaves every ISA relationship intact, but
+    # dropping two at once may not (when their supercategories lie on a
+    # cycle), so each is checked again before it goes.
+    return hierarchy.remove_redundant_facts(kb, hierarchy.implied_facts(kb))
 
-def indirect_redundancy(category1):
-    # Get all terminating chains
-    # Check each includes list for shared values with isa chain
-    includes_chains = []
-    category1_chain = []
-    # Get list of includes
-    c1list = get_includes_list(category1)
-    # For each includes get terminating chains
-    for i in c1list:
-        global skip
-        skip = category1
-        get_terminating_chains(i, includes_chains, [i])
-    skip = ""
-    # For category 1, get terminating chains
-    get_terminating_chains(category1, category1_chain, [])
-
-    count = 0
-    redundant_chains = []
-    # Check each category 1 terminating chain, see if in includes terminating chains
-    for i in range(len(category1_chain)):
-        for j in category1_chain[i]:
-            for k in includes_chains:
-                # If it is save it
-                if j in k:
-                    count += 1
-                    redundant_chains.append(list([k[0], j]))
-    if count > 0:
-        # If single indirect_redundancy
-        if count == 1:
-            # Complete
-            print "Your earlier statement that " + ARTICLES[redundant_chains[0][0]] + " " +\
-                  redundant_chains[0][0] + " is " + ARTICLES[redundant_chains[0][1]] + " " +\
-                  redundant_chains[0][1] + " is now redundant."
-            ISA[redundant_chains[0][0]].remove(redundant_chains[0][1])
-            INCLUDES[redundant_chains[0][1]].remove(redundant_chains[0][0])
-            print ISA
-            print INCLUDES
-        # If multi indirect_redundancy (can also detect chained redundnacy)
-        else:
-            print "The following statements you made earlier are now all redundant:"
-            # Get redundant chains except for last one
-            for i in redundant_chains[:-1]:
-                for j in find_chain(i[0], i[1]):
-                    print ARTICLES[j[0]] + " " + j[0] + " is " + ARTICLES[j[1]] + " " +\
-                          j[1] + ";"
-                    ISA[j[0]].remove(j[1])
-                    INCLUDES[j[1]].remove(j[0])
-            # Get last redundant chain.
-            for i in find_chain(redundant_chains[-1][0], redundant_chains[-1][1])[:-1]:
-                    print ARTICLES[i[0]] + " " + i[0] + " is " + ARTICLES[i[1]] + " " +\
-                          i[1] + ";"
-                    ISA[i[0]].remove(i[1])
-                    INCLUDES[i[1]].remove(i[0])
-            # Get last link in last redundant chain.
-            last = find_chain(redundant_chains[-1][0], redundant_chains[-1][1])[-1]
-            print ARTICLES[last[0]] + " " + last[0] + " is " + ARTICLES[last[1]] + " " +\
-                  last[1] + "."
-            ISA[last[0]].remove(last[1])
-            INCLUDES[last[1]].remove(last[0])
-            print ISA
-            print INCLUDES
+def begin_batch():
+    'Starts storing assertions without checking each one for redundancy.'
+    hierarchy.begin_batch(kb)
+
+def commit_batch(minimize = True):
+    'Indexes (and unless MINIMIZE is False, minimizes) everything stored since begin_batch; returns the batch counts.'
+    return hierarchy.commit_batch(kb, minimize)
+
+def report_removed_links(redundant):
+    'Returns a report of the links that were found redundant and removed.'
+    lines = ["The following statements you made earlier were redundant and have been removed:"]
+    for link in redundant[:-1]:
+        lines.append(hierarchy.report_link(kb, link, ";"))
+    lines.append(hierarchy.report_link(kb, redundant[-1], "."))
+    return "\n".join(lines)
+
+def indirect_redundancy(category1, category2):
+    'Removes the earlier facts made redundant by A CATEGORY1 IS A CATEGORY2 and reports them.'
+    redundant = hierarchy.remove_redundant_facts(kb, find_redundant_facts(category1, category2))
+    if len(redundant) == 0:
+        return "I understand"
+    if len(redundant) == 1:
+        lines = ["Your earlier statement that " + hierarchy.report_link(kb, redundant[0], " is now redundant.")]
     else:
-        print "I understand"
+        lines = ["The following statements you made earlier are now all redundant:"]
+        for link in redundant[:-1]:
+            lines.append(hierarchy.report_link(kb, link, ";"))
+        lines.append(hierarchy.report_link(kb, redundant[-1], "."))
+    return "\n".join(lines)
+
+def new_session():
+    'Returns the state kept between the sentences of one conversation: the listing "More." continues.'
+    return {'listing': None}
+
+# The conversation held at the console.
+console_session = new_session()
 
 def process(info) :
-    'Handles the user sentence, matching and responding.'
-    result_match_object = assertion_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+    'Handles the user sentence, printing the response.'
+    console.process(kb, info)
+
+def respond(info, session = None) :
+    'Handles the user sentence, matching it and returning the response.'
+    return answer_command(parse_command(info), session)
+
+def answer_command(command, session = None) :
+    'Returns the response to a parsed Command, as part of SESSION (by default, the console\'s).'
+    return console.answer_command(kb, command, session)
+
+def handle_command(command, session) :
+    'Works out the response to a parsed Command.'
+    if command.kind == 'assertion' :
+        items = command.items
         store_article(items[1], items[0])
         store_article(items[3], items[2])
 
+        # Inside a batch the fact is only stored; commit_batch
+        # looks for redundancy once for the whole batch.
+        if batch is not None:
+            if isa_test1(items[1], items[3]):
+                batch['repeated'] += 1
+            elif items[3] == items[1]:
+                batch['trivial'] += 1
+            else:
+                store_isa_fact(items[1], items[3])
+                batch['stored'] += 1
+            return ""
+
         # Direct Redundancy Detection
          # Existing Relation Check
         if isa_test1(items[1], items[3]):
-            print("You told me that earlier.")
-            return
+            return "You told me that earlier."
 
         # Reflexivity Property: a = a
         if(items[3] == items[1]):
-            print("You don't have to tell me that.")
-            return
+            return "You don't have to tell me that."
 
         # Transitivity: a = b & b = c : a = c
-        inc_list = get_includes_list(items[3])
-        isa_list = get_isa_list(items[1])
-        for includes in inc_list:
-            if includes in isa_list:
-                print("You don't have to tell me that.")
-                return
+        # (looked for above category1, which has far fewer direct
+        # supercategories than category2 may have subcategories)
+        for parent in get_isa_list(items[1]):
+            if isa_test1(parent, items[3]):
+                return "You don't have to tell me that."
         
         # Statement can create non-redundant relation
         store_isa_fact(items[1], items[3])
-        indirect_redundancy(items[1])
-        return
-    result_match_object = query_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+        return indirect_redundancy(items[1], items[3])
+    if command.kind == 'commit_batch' :
+        if batch is None :
+            return "There is no batch to commit."
+        finished = commit_batch()
+        lines = ["I stored " + str(finished['stored']) + " new statements."]
+        if finished['repeated'] > 0 :
+            lines.append(str(finished['repeated']) + " of your statements repeated earlier ones.")
+        if finished['trivial'] > 0 :
+            lines.append(str(finished['trivial']) + " of your statements were trivially true.")
+        if finished['redundant'] != [] :
+            lines.append(report_removed_links(finished['redundant']))
+        return "\n".join(lines)
+    if command.kind == 'begin_batch' :
+        if batch is not None :
+            return "A batch is already open."
+        begin_batch()
+        return "OK, I will check your statements when you commit the batch."
+    if batch is not None :
+        return "Please commit the batch before asking me anything else."
+    if command.kind == 'query' :
+        items = command.items
         answer = isa_test(items[1], items[3])
         if answer :
-            print("Yes, it is.")
+            return "Yes, it is."
         else :
-            print("No, as far as I have been informed, it is not.")
-        return
-    result_match_object = what_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+            return "No, as far as I have been informed, it is not."
+    if command.kind == 'what' :
+        items = command.items
         supersets = get_isa_list(items[1])
         if supersets != [] :
             first = supersets[0]
             a1 = get_article(items[1]).capitalize()
             a2 = get_article(first)
-            print(a1 + " " + items[1] + " is " + a2 + " " + first + ".")
-            return
+            return a1 + " " + items[1] + " is " + a2 + " " + first + "."
         else :
             subsets = get_includes_list(items[1])
             if subsets != [] :
                 first = subsets[0]
                 a1 = get_article(items[1]).capitalize()
                 a2 = get_article(first)
-                print(a1 + " " + items[1] + " is something more general than " + a2 + " " + first + ".")
-                return
+                return a1 + " " + items[1] + " is something more general than " + a2 + " " + first + "."
             else :
-                print("I don't know.")
-        return
-    result_match_object = why_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+                return "I don't know."
+    # "What is a [category], fully?"
+    if command.kind == 'fully' :
+        items = command.items
+        session['listing'] = None
+        if get_isa_list(items[1]) == [] :
+            return "I don't know."
+        session['listing'] = (get_article(items[1]).capitalize() + " " + items[1] + " is also ",
+                              hierarchy.walk_ancestors(kb, items[1]), [])
+        return get_article(items[1]).capitalize() + " " + items[1] + " is " + hierarchy.next_page(kb, session)
+    # "What are all the kinds of [category]?"
+    if command.kind == 'kinds' :
+        items = command.items
+        session['listing'] = None
+        if get_includes_list(items[0]) == [] :
+            return "I don't know of any kinds of " + items[0] + "."
+        session['listing'] = ("More kinds of " + items[0] + ": ", hierarchy.walk_descendants(kb, items[0]), [])
+        return "Kinds of " + items[0] + ": " + hierarchy.next_page(kb, session)
+    # "What do a [category1] and a [category2] have in common?"
+    if command.kind == 'common' :
+        named = named_category_pattern.findall(command.items[0])
+        subject = ", ".join(article.lower() + " " + noun for article, noun in named[:-1]) +\
+                  " and " + named[-1][0].lower() + " " + named[-1][1]
+        shared = common_ancestors([noun for article, noun in named])
+        if shared == [] :
+            return "As far as I know, " + subject + " have nothing in common."
+        return subject[0].upper() + subject[1:] + " are each " +\
+               " and ".join(get_article(category) + " " + category for category in shared) + "."
+    # "More."
+    if command.kind == 'more' :
+        if session.get('listing') is None :
+            return "There is nothing more to list."
+        return session['listing'][0] + hierarchy.next_page(kb, session)
+    if command.kind == 'why' :
+        items = command.items
         if not isa_test(items[1], items[3]) :
-            print("But that's not true, as far as I know!")
-        else:
-            answer_why(items[1], items[3])
-        return
-    print("I do not understand.  You entered: ")
-    print(info)
+            return "But that's not true, as far as I know!"
+        return hierarchy.cached_answer(kb, answer_why, items[1], items[3])
+    if command.kind == 'minimize' :
+        redundant = minimize_knowledge_base()
+        if redundant == [] :
+            return "None of your statements are redundant."
+        return report_removed_links(redundant)
+    if command.kind == 'save' :
+        filename = command.items[0]
+        try :
+            save_snapshot(kb, filename)
+            return "I saved the knowledge base to " + filename + "."
+        except OSError :
+            return "I could not write to " + filename + "."
+    if command.kind == 'load' :
+        filename = command.items[0]
+        try :
+            load_snapshot(kb, filename)
+            # The journal cannot describe the change, so it starts again from here.
+            if journal is not None : journal.restart()
+            return "I loaded the knowledge base from " + filename + "."
+        except (OSError, ValueError) :
+            return "I could not load a knowledge base from " + filename + "."
+    if command.kind == 'journal' :
+        filename = command.items[0]
+        if journal is not None :
+            journal.close()
+        try :
+            open_journal(kb, filename)
+            return "I will keep a journal in " + filename + "."
+        except (OSError, ValueError) :
+            return "I could not keep a journal in " + filename + "."
+    if command.kind == 'compact' :
+        if journal is None :
+            return "I am not keeping a journal."
+        elif journal.compact() :
+            return "I am compacting the journal."
+        else :
+            return "The journal is already being compacted."
+    if command.kind == 'keep_statistics' :
+        attach(kb)
+        return "I will keep statistics."
+    if command.kind == 'show_statistics' :
+        if instruments is None :
+            return "I am not keeping statistics."
+        return instruments.dump()
+    return "I do not understand.  You entered: \n" + command.text
 
 def answer_why(x, y):
-    'Handles the answering of a Why question.'
+    'Returns the answer to a Why question.'
     if x == y:
-        print("Because they are identical.")
-        return
+        return "Because they are identical."
     if isa_test1(x, y):
-        print("Because you told me that.")
-        return
-    print("Because " + report_chain(x, y))
-    return
+        return "Because you told me that."
+    return "Because " + report_chain(x, y)
 
-from functools import reduce
 def report_chain(x, y):
     'Returns a phrase that describes a chain of facts.'
-    chain = find_chain(x, y)
-    all_but_last = chain[0:-1]
-    last_link = chain[-1]
-    main_phrase = reduce(lambda x, y: x + y, map(report_link, all_but_last))
-    last_phrase = "and " + report_link(last_link)
-    new_last_phrase = last_phrase[0:-2] + '.'
-    return main_phrase + new_last_phrase
-
-def report_link(link):
-    'Returns a phrase that describes one fact.'
-    x = link[0]
-    y = link[1]
-    a1 = get_article(x)
-    a2 = get_article(y)
-    return a1 + " " + x + " is " + a2 + " " + y + ", "
-    
+    return hierarchy.report_chain(kb, x, y)
+
 def find_chain(x, z):
     'Returns a list of lists, which each sublist representing a link.'
-    if isa_test1(x, z):
-        return [[x, z]]
-    else:
-        for y in get_isa_list(x):
-            if isa_test(y, z):
-                temp = find_chain(y, z)
-                temp.insert(0, [x,y])
-                return temp
+    return hierarchy.find_chain(kb, x, z)
 
 def test() :
     # process("A hawk is a bird.")
@@ -302,6 +517,13 @@ def test() :
     # process("A fish is an organism.")
     # process("A salmon is a fish.")
 
-test()
-linneus()
+def main(arguments):
+    """
+    With no ARGUMENTS, runs the interactive loop. Otherwise each argument
+    names a file of commands ("-" for standard input) to answer in turn.
+    """
+    return console.main(kb, arguments)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
 
@@ -8,11 +8,23 @@
 # Ryan Chui & Megh Vakharia
 
 from re import *   # Loads the regular expression module.
+from collections import namedtuple, OrderedDict
+import sys
+from snapshot import save_snapshot, load_snapshot
+from journal import open_journal
+from instrument import attach
+from render import render, write_names, write_says, write_series
+import hierarchy
+import console
+from heapq import heappush, heappop
+from math import log
 
 # The ISA relation is represented using a dictionary, ISA.
 # There is a corresponding inverse dictionary, INCLUDES.
 # Each entry in the ISA dictionary is of the form
 #  ('turtle' : ['reptile', 'shelled-creature'])
+# Every name is interned as it is stored, so however many facts mention
+# a category, its name is held in memory once.
 ISA = {}
 INCLUDES = {}
 ARTICLES = {}
@@ -22,7 +34,11 @@ ARTICLES = {}
 # The above corresponds to the statements:
 # "Jones says than an animal is an organism"
 # "An animal is a living-thing."
+# Every fact has an entry, so QUALIFIERS also tells in one lookup whether
+# a fact is known. Facts nobody is named for all share the empty tuple
+# UNQUALIFIED, rather than each holding an empty list of its own.
 QUALIFIERS = {}
+UNQUALIFIED = ()
 
 # Stores reliability information - a boolean for relability
 # as well as the source of this information (whether the info
@@ -32,11 +48,66 @@ QUALIFIERS = {}
 #  ( 'Jones': { unreliable: [], reliable: ["Megh"] ) == "Megh says Jones is a reliable source."
 RELIABILITY = {}
 
+# The credibility of each source (see source_credibility), worked out from
+# RELIABILITY when first needed and forgotten when a new reliability
+# statement about that source arrives.
+SOURCE_SCORES = {}
+# A source nobody has spoken for or against is believed this much; each
+# reliability statement about it counts as much as this first impression.
+DEFAULT_CREDIBILITY = 0.9
+# Credibility is worked out to within this much.
+CREDIBILITY_TOLERANCE = 1e-6
+
+# The facts each source has asserted, e.g.
+#  ( 'Jones': { ('animal', 'organism') } )
+# kept up to date by store_isa_fact and remove_isa_fact, and the
+# credibility of each fact (see link_credibility), worked out when first
+# needed and forgotten when anything about one of its sources changes.
+SOURCE_FACTS = {}
+LINK_SCORES = {}
+
+# The sources each source has made reliability statements about, e.g.
+#  ( 'Megh': { 'Jones' } ) == "Megh says Jones is a reliable source."
+# A source's credibility rests on the credibility of everyone who
+# vouches for it, so a change to one spreads along these.
+VOUCHES = {}
+
+# While a batch is open, assertions are stored without being indexed or
+# checked for redundancy; this dictionary counts what happened to them.
+batch = None
+
+# When a journal is open (see journal.py), every change to the
+# dictionaries above is also logged to it.
+journal = None
+
+# When instruments are attached (see instrument.py), every command and
+# every search is measured by them.
+instruments = None
+
+# Answers already given (see hierarchy.cached_answer), least recently
+# used first, each with the generation it was worked out in. Every change
+# to the knowledge base starts a new generation, and CHANGED records the
+# last generation in which each category changed.
+ANSWERS = OrderedDict()
+CHANGED = {}
+generation = 0
+
+# The reachability index over ISA (see hierarchy.py).
+ANCESTORS = {}
+BITS = {}
+BIT_NAMES = []
+
+# This module: the knowledge base, as hierarchy.py, snapshot.py and the
+# other modules that work on it are given it.
+kb = sys.modules[__name__]
+
 def store_reliability_statement(target, reliableLabel, qualifier = None):
     """
     Stores the statement of reliability to the target. If the qualifier's name
     is passed in, it is stored with the reliability statement.
     """
+    target = sys.intern(target)
+    if qualifier is not None: qualifier = sys.intern(qualifier)
     try:
         targetList = RELIABILITY[target]
         if reliableLabel in targetList:
@@ -52,86 +123,137 @@ def store_reliability_statement(target, reliableLabel, qualifier = None):
             RELIABILITY[target] = { reliableLabel : [ qualifier ] }
         else: 
             RELIABILITY[target] = { reliableLabel : [ ] }
+    if qualifier is not None:
+        try:
+            VOUCHES[qualifier].add(target)
+        except KeyError:
+            VOUCHES[qualifier] = {target}
+    update_source_scores(target)
+    if journal is not None:
+        journal.append('reliability', target, reliableLabel, qualifier)
+
+def update_source_scores(source):
+    'Brings the credibility of SOURCE, of everyone it vouches for, and of every fact they asserted up to date.'
+    # A score not worked out yet will be when it is first needed, and so
+    # will everything that rests on it.
+    if source not in SOURCE_SCORES: return
+    # A change to one score changes those it vouches for less and less
+    # the further it spreads, so it is followed only while it matters.
+    pending = [source]
+    queued = {source}
+    while pending:
+        source = pending.pop()
+        queued.discard(source)
+        score = vouched_credibility(source, SOURCE_SCORES)
+        if abs(score - SOURCE_SCORES[source]) < CREDIBILITY_TOLERANCE: continue
+        SOURCE_SCORES[source] = score
+        for fact in SOURCE_FACTS.get(source, ()):
+            LINK_SCORES.pop(fact, None)
+            hierarchy.touch(kb, fact[0])
+        for target in VOUCHES.get(source, ()):
+            if target in SOURCE_SCORES and target not in queued:
+                queued.add(target)
+                pending.append(target)
+
+def reindex_sources():
+    'Rebuilds SOURCE_FACTS and VOUCHES from QUALIFIERS and RELIABILITY, and forgets every score and answer.'
+    SOURCE_SCORES.clear()
+    LINK_SCORES.clear()
+    SOURCE_FACTS.clear()
+    VOUCHES.clear()
+    forget_answers()
+    for category1 in QUALIFIERS:
+        for category2, sources in QUALIFIERS[category1].items():
+            for source in sources:
+                SOURCE_FACTS.setdefault(source, set()).add((category1, category2))
+    for target in RELIABILITY:
+        for sources in RELIABILITY[target].values():
+            for source in sources:
+                VOUCHES.setdefault(source, set()).add(target)
 
 def store_isa_fact(category1, category2, qualifier = None):
     """
     Stores one fact of the form A BIRD IS AN ANIMAL. If the statement
     has been qualified, the qualifier's name is stored as well.
     """
-    try :
-        c1list = ISA[category1]
-        if category2 not in c1list: c1list.append(category2)
-    except KeyError :
-        ISA[category1] = [category2]
+    category1 = sys.intern(category1)
+    category2 = sys.intern(category2)
+    if qualifier is not None: qualifier = sys.intern(qualifier)
     try:
         c1qualifiers = QUALIFIERS[category1]
-        if category2 in c1qualifiers: 
-            if qualifier is not None:
-                c1qualifiers[category2].append(qualifier) 
-        else:
-            if qualifier is not None:
-                c1qualifiers[category2] = [qualifier]
-            else:
-                c1qualifiers[category2] = []
     except KeyError:
-        if qualifier is not None:
-            QUALIFIERS[category1] = { category2: [ qualifier ]   }
-        else: 
-            QUALIFIERS[category1] = { category2: [ ] }
-    try :
-        c2list = INCLUDES[category2]
-        if category1 not in c2list: c2list.append(category1)
-    except KeyError :
-        INCLUDES[category2] = [category1]
+        c1qualifiers = QUALIFIERS[category1] = {}
+    qualifiers = c1qualifiers.get(category2)
+    new = qualifiers is None
+    if qualifier is None:
+        if new: c1qualifiers[category2] = UNQUALIFIED
+    elif isinstance(qualifiers, list):
+        qualifiers.append(qualifier)
+    else:
+        c1qualifiers[category2] = [qualifier]
+    if new:
+        try :
+            ISA[category1].append(category2)
+        except KeyError :
+            ISA[category1] = [category2]
+        try :
+            INCLUDES[category2].append(category1)
+        except KeyError :
+            INCLUDES[category2] = [category1]
+    if qualifier is not None:
+        try:
+            SOURCE_FACTS[qualifier].add((category1, category2))
+        except KeyError:
+            SOURCE_FACTS[qualifier] = {(category1, category2)}
+    LINK_SCORES.pop((category1, category2), None)
+    hierarchy.touch(kb, category1)
+    if batch is None:
+        hierarchy.index_isa_fact(kb, category1, category2)
+    else:
+        batch['touched'].add(category1)
+    if journal is not None:
+        journal.append('isa', category1, category2, qualifier)
+
+def remove_isa_fact(category1, category2, uninclude = True):
+    """
+    Removes one fact of the form A BIRD IS AN ANIMAL, along with its
+    qualifiers. If UNINCLUDE is False, CATEGORY1 is left on the INCLUDES
+    list of CATEGORY2 for the caller to take off (see
+    hierarchy.remove_redundant_facts).
+    """
+    ISA[category1].remove(category2)
+    if uninclude: INCLUDES[category2].remove(category1)
+    for qualifier in QUALIFIERS[category1].pop(category2, []):
+        SOURCE_FACTS[qualifier].discard((category1, category2))
+    LINK_SCORES.pop((category1, category2), None)
+    hierarchy.touch(kb, category1)
+    if journal is not None:
+        journal.append('remove', category1, category2)
+    hierarchy.unindex_isa_fact(kb, category1, category2)
         
 def get_isa_list(category1):
     'Retrieves any existing list of things that CATEGORY1 is a'
-    try:
-        c1list = ISA[category1]
-        return c1list
-    except:
-        return []
+    return hierarchy.get_isa_list(kb, category1)
     
 def get_includes_list(category1):
     'Retrieves any existing list of things that CATEGORY1 includes'
-    try:
-        c1list = INCLUDES[category1]
-        return c1list
-    except:
-        return []
+    return hierarchy.get_includes_list(kb, category1)
     
 def isa_test1(category1, category2):
     'Returns True if category 2 is (directly) on the list for category 1.'
-    c1list = get_isa_list(category1)
-    return c1list.__contains__(category2)
+    return category2 in QUALIFIERS.get(category1, UNQUALIFIED)
     
-def isa_test(category1, category2, depth_limit = 10):
-    'Returns True if category 1 is a subset of category 2 within depth_limit levels'
-    if category1 == category2 : return True
-    if isa_test1(category1, category2) : return True
-    if depth_limit < 2 : return False
-    for intermediate_category in get_isa_list(category1):
-        if isa_test(intermediate_category, category2, depth_limit - 1):
-            return True
-    return False
-
-def isa_test_with_trail(category1, category2, depth_limit = 10):
+def isa_test(category1, category2):
+    'Returns True if category 1 is a subset of category 2'
+    return hierarchy.isa_test(kb, category1, category2)
+
+def common_ancestors(categories):
+    'Returns the most specific categories that every one of CATEGORIES is, in alphabetical order.'
+    return hierarchy.common_ancestors(kb, categories)
+
+def isa_test_with_trail(category1, category2):
     'Returns the chain of facts that connects category1 to category2.'
-    trail = []
-    if category1 == category2 : 
-        trail += [category1]
-        return trail
-    if isa_test1(category1, category2) : 
-        trail += [category1, category2]
-        return trail
-    if depth_limit < 2 : return []
-    for intermediate_category in get_isa_list(category1):
-        trailhead = isa_test_with_trail(intermediate_category, category2, depth_limit - 1)
-        if len(trailhead) > 0:
-            trail += [category1]
-            trail += trailhead
-            return trail
-    return []
+    return hierarchy.shortest_chain(kb, category1, category2)
 
 
 def find_qualifiers(category1, category2):
@@ -140,66 +262,217 @@ def find_qualifiers(category1, category2):
         return QUALIFIERS[category1][category2]
     return []
 
+def source_credibility(source):
+    'Returns how far (from 0 to 1) the word of SOURCE can be trusted, given everyone who vouches for it.'
+    try:
+        return SOURCE_SCORES[source]
+    except KeyError:
+        pass
+    # Find every source this one's credibility rests on whose own
+    # credibility is not known yet, by following the reliability
+    # statements back to the sources who made them.
+    unknown = [source]
+    seen = {source}
+    for target in unknown:
+        for vouchers in RELIABILITY.get(target, {}).values():
+            for voucher in vouchers:
+                if voucher not in seen and voucher not in SOURCE_SCORES:
+                    seen.add(voucher)
+                    unknown.append(voucher)
+    # Sources that vouch for each other in a circle depend on one
+    # another, so refine all of them together until they settle; the
+    # furthest back are worked out first, so without circles one round
+    # is enough.
+    scores = dict.fromkeys(unknown, DEFAULT_CREDIBILITY)
+    for _ in range(100):
+        change = 0.0
+        for target in reversed(unknown):
+            score = vouched_credibility(target, scores)
+            change = max(change, abs(score - scores[target]))
+            scores[target] = score
+        if change < CREDIBILITY_TOLERANCE: break
+    SOURCE_SCORES.update(scores)
+    return scores[source]
+
+def vouched_credibility(source, scores):
+    'Returns the credibility of SOURCE, taking that of those who vouch for it from SCORES where it is there.'
+    # Each statement that the source is reliable (or unreliable) counts
+    # as much as its maker can be trusted; one the user made counts fully.
+    weights = {'reliable': 0.0, 'unreliable': 0.0}
+    for label, vouchers in RELIABILITY.get(source, {}).items():
+        if vouchers == []:
+            weights[label] += 1.0
+        for voucher in vouchers:
+            weights[label] += scores[voucher] if voucher in scores else source_credibility(voucher)
+    return (DEFAULT_CREDIBILITY + weights['reliable']) /\
+           (1.0 + weights['reliable'] + weights['unreliable'])
+
+def link_credibility(category1, category2):
+    'Returns how far (from 0 to 1) the fact that a category 1 is a category 2 can be trusted.'
+    try:
+        return LINK_SCORES[(category1, category2)]
+    except KeyError:
+        pass
+    # Something the user said directly is certain; otherwise the fact
+    # stands unless every one of its sources is wrong.
+    sources = find_qualifiers(category1, category2)
+    if len(sources) == 0:
+        credibility = 1.0
+    else:
+        doubt = 1.0
+        for source in sources:
+            doubt *= 1.0 - source_credibility(source)
+        credibility = 1.0 - doubt
+    LINK_SCORES[(category1, category2)] = credibility
+    return credibility
+
+def chain_credibility(trail):
+    'Returns how far (from 0 to 1) the chain of categories TRAIL can be trusted.'
+    credibility = 1.0
+    for i in range(len(trail) - 1):
+        credibility *= link_credibility(trail[i], trail[i + 1])
+    return credibility
+
+def most_credible_chain(category1, category2):
+    'Returns the most credible list of categories leading from category1 up to category2, or [].'
+    if category1 == category2 : return [category1]
+    if not isa_test(category1, category2) : return []
+    # Dijkstra's search up the ISA links, where each link costs minus the
+    # log of its credibility, so the cheapest chain is the most credible.
+    # Only categories that lie between the two are ever visited.
+    best = {category1: (0.0, None)}
+    queue = [(0.0, category1)]
+    done = set()
+    while queue:
+        cost, category = heappop(queue)
+        if category in done : continue
+        if category == category2 : break
+        done.add(category)
+        for parent in get_isa_list(category):
+            if parent != category2 and not hierarchy.has_ancestor(kb, parent, category2) : continue
+            credibility = link_credibility(category, parent)
+            parent_cost = cost + (-log(credibility) if credibility > 0.0 else float('inf'))
+            if parent not in best or parent_cost < best[parent][0]:
+                best[parent] = (parent_cost, category)
+                heappush(queue, (parent_cost, parent))
+    if category2 not in best : return []
+    chain = []
+    category = category2
+    while category is not None:
+        chain.insert(0, category)
+        category = best[category][1]
+    return chain
+
 def report_chain_with_qualifiers(category1, category2):
     """
     Reports the connections between category1 and category2 with related qualifier
     information, such as qualifiers and their reliability.
     """
-    # Gets chain between category1 and category2
-    trail = isa_test_with_trail(category1, category2)
+    # Gets the most credible chain between category1 and category2
+    trail = most_credible_chain(category1, category2)
     if len(trail) > 0: # A chain exists!
-        resp = "Because " # Begin the response string
-        qualifying_sources = [] # Stores all of the qualifiers related to the statement
-        i = 0
-        while i < len(trail) - 1:
-            isa_qualifiers = QUALIFIERS[trail[i]][trail[i + 1]]
-            # Check if someone has qualified the statement and if so,
-            # list their names.
-            if len(isa_qualifiers) >= 1:
-                qualifier = isa_qualifiers[0]
-                qualifying_sources.append(qualifier)
-                resp += isa_qualifiers[0] + " "
-                for qualifier in isa_qualifiers[1:]:
-                    qualifying_sources.append(qualifier)
-                    resp += "and " + qualifier + " "
-                if len(isa_qualifiers) == 1:
-                    resp += "says that "
-                else:
-                    resp += "say that"
-            
-            # List the categories that are being matched.
-            resp += ARTICLES[trail[i]] + " " + trail[i] + " is " +\
-                    ARTICLES[trail[i+1]]+  " " + trail[i+1] 
-            if i + 1 == len(trail) - 1:
-                resp += "."
-            else:
-                resp += ",\nand "
-            i += 1
-        
-        # At this point, the ISA chain should be fully explored.
-        # Now we check for unreliable sources within the chain:
-        for qualifier in set(qualifying_sources):
-            if qualifier in RELIABILITY:
-                if "unreliable" in RELIABILITY[qualifier]:
-                    resp += "\n"
-                    # This person has been called "unreliable".
-                    # Now we explore if this statement has been qualified.
-                    unreliablity_qualifiers = RELIABILITY[qualifier]["unreliable"]
-                    resp += "However, "
-                    if len(unreliablity_qualifiers) >= 1:
-                        resp += unreliablity_qualifiers[0] + " "
-                        for unreliablity_somebody in unreliablity_qualifiers[1:]:
-                            resp += "and " + unreliablity_somebody + " "
-                        if len(unreliablity_qualifiers) == 1:
-                            resp += "says that "
-                        else:
-                            resp += "say that "
-                    resp += qualifier + " is an unreliable source,"
-                    resp += "\nand therefore we cannot be certain about this chain of reasoning."
-        return resp
+        return render(write_chain_with_qualifiers, trail)
     else: # Chain does not exist
         return "It is not possible."
 
+def write_chain_with_qualifiers(out, trail):
+    """
+    Writes the explanation of the chain of categories TRAIL to the writer
+    OUT: who says that each category is the next, and which of them have
+    been called unreliable.
+    """
+    out.write("Because ")
+    # Every qualifier of the chain, in order, including those of the
+    # links a long chain leaves out of the explanation.
+    qualifying_sources = {}
+    for i in range(len(trail) - 1):
+        qualifying_sources.update(dict.fromkeys(QUALIFIERS[trail[i]][trail[i + 1]]))
+    def write_qualified_link(out, i):
+        isa_qualifiers = QUALIFIERS[trail[i]][trail[i + 1]]
+        # Check if someone has qualified the statement and if so,
+        # list their names.
+        if len(isa_qualifiers) >= 1:
+            write_says(out, isa_qualifiers)
+        # List the categories that are being matched.
+        out.write(ARTICLES[trail[i]] + " " + trail[i] + " is " +
+                  ARTICLES[trail[i + 1]] + " " + trail[i + 1])
+    write_series(out, range(len(trail) - 1), write_qualified_link, ",\nand ", ",\nand ")
+    if len(trail) > 1: out.write(".")
+
+    # At this point, the ISA chain should be fully explored.
+    # Now we check for unreliable sources within the chain:
+    for qualifier in qualifying_sources:
+        if qualifier in RELIABILITY:
+            if "unreliable" in RELIABILITY[qualifier]:
+                # This person has been called "unreliable".
+                # Now we explore if this statement has been qualified.
+                unreliablity_qualifiers = RELIABILITY[qualifier]["unreliable"]
+                out.write("\nHowever, ")
+                if len(unreliablity_qualifiers) >= 1:
+                    write_says(out, unreliablity_qualifiers)
+                out.write(qualifier + " is an unreliable source,")
+                out.write("\nand therefore we cannot be certain about this chain of reasoning.")
+
+def write_facts(out, facts):
+    'Writes "A X IS A Y, that A Y IS A Z, ... and that ...." for the links FACTS.'
+    write_series(out, facts, lambda out, link: hierarchy.write_link(out, kb, link), ",\nthat ", ",\nand that ")
+    out.write(".")
+
+def write_told_me(out, names):
+    'Writes "NAMES told me that.", or "you told me that." if there are no NAMES.'
+    if len(names) >= 1:
+        write_names(out, names)
+    else:
+        out.write("you")
+    out.write(" told me that.")
+
+def write_reliability(out, name, article, reliability_term, opposite_reliability, why_q):
+    'Writes the answer to a question about the reliability of the source NAME.'
+    reliability_information = RELIABILITY[name]
+    if reliability_term in reliability_information:
+        out.write("Because " if why_q else "Yes, ")
+        write_told_me(out, reliability_information[reliability_term])
+    else:
+        out.write("I don't know if " + name + " is " + article + " " + reliability_term + " source")
+        if opposite_reliability in reliability_information:
+            out.write(",\nbut ")
+            opposite_reliability_qualifiers = reliability_information[opposite_reliability]
+            if len(opposite_reliability_qualifiers) >= 1:
+                write_names(out, opposite_reliability_qualifiers)
+            else:
+                out.write("you")
+            out.write(" told me that " + name + " is " + article + " " + opposite_reliability + " source")
+        out.write(".")
+    if why_q: return
+    # Weigh up everything said about the source, and about those who said
+    # it, unless that only confirms the answer already given.
+    verdict = "reliable" if source_credibility(name) >= 0.5 else "unreliable"
+    if reliability_term in reliability_information and verdict == reliability_term: return
+    out.write("\nTaking everyone's reliability into account, I believe " + name + " is " +
+              ("a " if verdict == "reliable" else "an ") + verdict + " source.")
+
+def assertion_refusal(category1, category2, qualifier = None):
+    """
+    Returns why the statement (by QUALIFIER) that a CATEGORY1 is a
+    CATEGORY2 should not be stored: 'repeated', 'trivial' or 'implied'
+    (by a fact about one of CATEGORY1's direct supercategories), or None
+    if it should.
+    """
+    # Direct Redundancy Detection
+    # Existing Relation Check
+    if isa_test1(category1, category2) and qualifier_for_chain(category1, category2, qualifier):
+        return 'repeated'
+    # Reflexivity Property: a = a
+    if category1 == category2:
+        return 'trivial'
+    # Transitivity: a = b & b = c : a = c
+    # (looked for above category1, which has far fewer direct
+    # supercategories than category2 may have subcategories)
+    for parent in get_isa_list(category1):
+        if isa_test1(parent, category2):
+            return 'implied'
+    return None
+
 def qualifier_for_chain(category1, category2, qualifier = None):
     'Returns True if the qualifier exists for category 1 to category 2.'
     qualifierList = QUALIFIERS[category1]
@@ -215,26 +488,60 @@ def qualify_test(category1, category2):
         return qualifier_list
     return []
 
+def minimize_knowledge_base():
+    """
+    Removes every stored fact that the others imply, along with its
+    qualifiers. Returns the links removed, each as [category1, category2,
+    qualifiers].
+    """
+    # Dropping one implied link leaves every ISA relationship intact, but
+    # dropping two at once may not (when their supercategories lie on a
+    # cycle), so each is checked again before it goes.
+    redundant = [[category, parent, find_qualifiers(category, parent)]
+                 for category, parent in hierarchy.implied_facts(kb)]
+    return hierarchy.remove_redundant_facts(kb, redundant)
+
+def begin_batch():
+    'Starts storing assertions without indexing each one.'
+    hierarchy.begin_batch(kb)
+    batch['implied'] = 0
+
+def commit_batch(minimize = False):
+    """
+    Indexes everything stored since begin_batch, and returns the batch
+    counts. The statements were checked as they came, as they are outside
+    a batch, so no earlier fact is removed unless MINIMIZE is True.
+    """
+    return hierarchy.commit_batch(kb, minimize)
+
+def report_removed_links(redundant):
+    'Returns a report of the links that were found redundant and removed, with their qualifiers.'
+    return render(write_removed_links, redundant)
+
+def write_removed_links(out, redundant):
+    'Writes a report of the links REDUNDANT, each as [category1, category2, qualifiers], to the writer OUT.'
+    out.write("The following statements were redundant and have been removed:")
+    for link in redundant:
+        out.write("\n")
+        if len(link[2]) >= 1:
+            write_says(out, link[2])
+        out.write(hierarchy.report_link(kb, link, "." if link is redundant[-1] else ";"))
+
+def forget_answers():
+    'Forgets every answer in ANSWERS, as when the whole knowledge base is replaced.'
+    hierarchy.forget_answers(kb)
+
 def store_article(noun, article):
     'Saves the article (in lower-case) associated with a noun.'
-    ARTICLES[noun] = article.lower()
+    hierarchy.store_article(kb, noun, article)
 
 def get_article(noun):
     'Returns the article associated with the noun, or if none, the empty string.'
-    try:
-        article = ARTICLES[noun]
-        return article
-    except KeyError:
-        return ''
+    return hierarchy.get_article(kb, noun)
 
 def linneus():
     'The main loop; it gets and processes user input, until "bye".'
-    print('This is Linneus.  Please tell me "ISA" facts and ask questions.')
-    print('For example, you could tell me "An ant is an insect."')
-    while True :
-        info = input('Enter an ISA fact, or "bye" here: ')
-        if info == 'bye': return 'Goodbye now!'
-        process(info)
+    return console.linneus(kb)
 
 # Some regular expressions used to parse the user sentences:    
 # assertion_pattern: "A [category1] is a [category2]."
@@ -246,6 +553,16 @@ query_pattern = compile(r"^is\s+(a|an)\s+([-\w]+)\s+(a|an)\s+([-\w]+)(\?\.)*", I
 what_pattern = compile(r"^What\s+is\s+(a|an)\s+([-\w]+)(\?\.)*", IGNORECASE)    
 why_pattern = compile(r"^Why\s+is\s+(a|an)\s+([-\w]+)\s+(a|an)\s+([-\w]+)(\?\.)*", IGNORECASE)    
 
+# Listing questions: "What is a [category], fully?",
+# "What are all the kinds of [category]?" and "More."
+fully_pattern = compile(r"^What\s+is\s+(a|an)\s+([-\w]+),?\s+fully(\?|\.)*$", IGNORECASE)
+kinds_pattern = compile(r"^What\s+are\s+all\s+the\s+kinds\s+of\s+([-\w]+)(\?|\.)*$", IGNORECASE)
+more_pattern = compile(r"^More(\.|\?|\!)*$", IGNORECASE)
+# Common ancestors: "What do a [category1] and a [category2] have in common?"
+# (or of three or more: "What do a hawk, a salmon and a frog ...")
+common_pattern = compile(r"^What\s+do\s+((a|an)\s+[-\w]+((,|,?\s+and)\s+(a|an)\s+[-\w]+)+)\s+have\s+in\s+common(\?|\.)*$", IGNORECASE)
+named_category_pattern = compile(r"\b(a|an)\s+([-\w]+)", IGNORECASE)
+
 # Part III. Qualified Statements & Plausible Arguments Regex
 # Qualified statement: "[somebody] says that [assertion_pattern]"
 qualified_pattern = compile(r"^([-\w]+)\s+says\s+that?\s+?", IGNORECASE)
@@ -257,129 +574,243 @@ reliability_why_pattern = compile(r"^(Why)?[\s+]?is\s+([-\w]+)\s+(a|an)\s+(relia
 plausible_why_pattern = compile(r"^Why\s+is\s+it\s+possible\s+that\s+(a|an)\s+([-\w]+)\s+is+\s+(a|an)\s+([-\w]+)(\?|\.)*$", IGNORECASE)
 # Why style 2: Why?
 short_why_pattern = compile(r"^Why(\?)*$", IGNORECASE)
+# Minimize command: "Minimize the knowledge base."
+minimize_pattern = compile(r"^Minimize(\s+the\s+knowledge\s+base)?(\.|\!)*$", IGNORECASE)
+# Batch commands: "Begin a batch." and "Commit the batch."
+begin_batch_pattern = compile(r"^Begin(\s+a)?\s+batch(\.|\!)*$", IGNORECASE)
+commit_batch_pattern = compile(r"^Commit(\s+the)?\s+batch(\.|\!)*$", IGNORECASE)
+# Snapshot commands: "Save the knowledge base to [filename]."
+# and "Load the knowledge base from [filename]."
+save_pattern = compile(r"^Save\s+the\s+knowledge\s+base\s+to\s+(\S+?)(\.|\!)*$", IGNORECASE)
+load_pattern = compile(r"^Load\s+the\s+knowledge\s+base\s+from\s+(\S+?)(\.|\!)*$", IGNORECASE)
+# Source question: "What does [somebody] say?"
+sayings_pattern = compile(r"^What\s+does\s+([-\w]+)\s+say(\?|\.)*$", IGNORECASE)
+# Journal commands: "Keep a journal in [filename]." and "Compact the journal."
+journal_pattern = compile(r"^Keep\s+a\s+journal\s+in\s+(\S+?)(\.|\!)*$", IGNORECASE)
+compact_pattern = compile(r"^Compact\s+the\s+journal(\.|\!)*$", IGNORECASE)
+# Statistics commands: "Keep statistics." and "Show the statistics."
+keep_statistics_pattern = compile(r"^Keep\s+statistics(\.|\!)*$", IGNORECASE)
+show_statistics_pattern = compile(r"^Show(\s+the)?\s+statistics(\.|\!)*$", IGNORECASE)
+
+# Each pattern above, in the order they are tried, with the first words
+# that a sentence it matches can begin with (None: any word, such as a
+# source's name). Only the patterns for the first word of a sentence are
+# ever tried on it.
+COMMAND_PATTERNS = [
+    ('assertion', assertion_pattern, ['a', 'an']),
+    ('commit_batch', commit_batch_pattern, ['commit']),
+    ('begin_batch', begin_batch_pattern, ['begin']),
+    ('query', query_pattern, ['is']),
+    ('fully', fully_pattern, ['what']),
+    ('what', what_pattern, ['what']),
+    ('kinds', kinds_pattern, ['what']),
+    ('common', common_pattern, ['what']),
+    ('more', more_pattern, ['more']),
+    ('sayings', sayings_pattern, ['what']),
+    ('why', why_pattern, ['why']),
+    ('reliability', reliability_pattern, None),
+    ('reliability_why', reliability_why_pattern, ['why', 'is']),
+    ('plausible_why', plausible_why_pattern, ['why']),
+    ('short_why', short_why_pattern, ['why']),
+    ('minimize', minimize_pattern, ['minimize']),
+    ('save', save_pattern, ['save']),
+    ('load', load_pattern, ['load']),
+    ('journal', journal_pattern, ['keep']),
+    ('compact', compact_pattern, ['compact']),
+    ('keep_statistics', keep_statistics_pattern, ['keep']),
+    ('show_statistics', show_statistics_pattern, ['show']),
+]
+
+def commands_by_word():
+    'Returns a dictionary from each first word to the (kind, pattern) pairs worth trying.'
+    table = {}
+    for kind, pattern, words in COMMAND_PATTERNS:
+        for word in words or []:
+            table[word] = []
+    for kind, pattern, words in COMMAND_PATTERNS:
+        for word in words or table:
+            table[word].append((kind, pattern))
+    return table
+
+COMMANDS_BY_WORD = commands_by_word()
+# The patterns tried on sentences beginning with any other word.
+COMMANDS_FOR_OTHER_WORDS = [(kind, pattern) for kind, pattern, words in COMMAND_PATTERNS
+                            if words is None]
+
+# A parsed sentence: KIND names the pattern it matched ('unknown' if
+# none did), QUALIFIER is the name in front of "says that" (or None),
+# ITEMS holds the groups of the match, and TEXT is the sentence with
+# any qualification taken off.
+Command = namedtuple('Command', ['kind', 'qualifier', 'items', 'text'])
+
+def parse_command(info):
+    'Classifies the user sentence by its first word and returns a Command.'
+    qualifier = None
+    words = info.split(None, 2)
+    # Check if statement is qualified
+    if len(words) > 1 and words[1].lower() == 'says':
+        qualifier_match_object = qualified_pattern.match(info)
+        if qualifier_match_object != None:
+            items = qualified_pattern.split(info)
+            qualifier = items[1]
+            info = items[2]
+            words = info.split(None, 1)
+    if words != []:
+        for kind, pattern in COMMANDS_BY_WORD.get(words[0].rstrip('?.!').lower(),
+                                                  COMMANDS_FOR_OTHER_WORDS):
+            result_match_object = pattern.match(info)
+            if result_match_object != None:
+                return Command(kind, qualifier, result_match_object.groups(), info)
+    return Command('unknown', qualifier, (), info)
+
+def new_session():
+    """
+    Returns the state kept between the sentences of one conversation:
+    the last statement made or asked about, which "Why?" refers to, and
+    the listing "More." continues.
+    """
+    return {'last_statement': None, 'listing': None}
 
-last_statement = None
+# The conversation held at the console.
+console_session = new_session()
 
 def process(info) :
-    'Handles the user sentence, matching and responding.'
-    global last_statement
-    name = None
-    # Check if statement is qualified
-    qualifier_match_object = qualified_pattern.match(info)
-    if qualifier_match_object != None:
-        items = qualified_pattern.split(info)
-        name = items[1]
-        statement = items[2]
-        info = statement
-    result_match_object = assertion_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+    'Handles the user sentence, printing the response.'
+    console.process(kb, info)
+
+def respond(info, session = None) :
+    'Handles the user sentence, matching it and returning the response.'
+    return answer_command(parse_command(info), session)
+
+def answer_command(command, session = None) :
+    'Returns the response to a parsed Command, as part of SESSION (by default, the console\'s).'
+    return console.answer_command(kb, command, session)
+
+def handle_command(command, session) :
+    'Works out the response to a parsed Command.'
+    name = command.qualifier
+    info = command.text
+    if command.kind == 'assertion':
+        items = command.items
         store_article(items[1], items[0])
         store_article(items[3], items[2])
-        last_statement = items
-
-        # Direct Redundancy Detection
-        # Existing Relation Check
-        if isa_test1(items[1], items[3]) and qualifier_for_chain(items[1], items[3], name):
-            print("You told me that earlier.")
-            return
-
-        # Reflexivity Property: a = a
-        if(items[3] == items[1]):
-            print("You don't have to tell me that.")
-            return
-
-        # Transitivity: a = b & b = c : a = c
-        inc_list = get_includes_list(items[3])
-        isa_list = get_isa_list(items[1])
-        for includes in inc_list:
-            if includes in isa_list:
-                print("You don't have to tell me that.")
-                return
-        
+        session['last_statement'] = items
+        refusal = assertion_refusal(items[1], items[3], name)
+
+        # Inside a batch the statement is checked and stored just the
+        # same, but only indexed, with the rest of the batch, on commit.
+        if batch is not None:
+            batch[refusal or 'stored'] += 1
+            if refusal is None: store_isa_fact(items[1], items[3], name)
+            return ""
+        if refusal == 'repeated':
+            return "You told me that earlier."
+        if refusal is not None:
+            return "You don't have to tell me that."
+
         # Statement can create non-redundant relation
         store_isa_fact(items[1], items[3], name)
-        print("I understand.")
-        return
+        return "I understand."
+    # Checking for the end of a batch:
+    # "Commit the batch."
+    if command.kind == 'commit_batch':
+        if batch is None:
+            return "There is no batch to commit."
+        finished = commit_batch()
+        lines = ["I stored " + str(finished['stored']) + " new statements."]
+        if finished['repeated'] > 0:
+            lines.append(str(finished['repeated']) + " of your statements repeated earlier ones.")
+        if finished['trivial'] > 0:
+            lines.append(str(finished['trivial']) + " of your statements were trivially true.")
+        if finished['implied'] > 0:
+            lines.append(str(finished['implied']) + " of your statements followed from earlier ones.")
+        if finished['redundant'] != []:
+            lines.append(report_removed_links(finished['redundant']))
+        return "\n".join(lines)
+    # Checking for the start of a batch:
+    # "Begin a batch."
+    if command.kind == 'begin_batch':
+        if batch is not None:
+            return "A batch is already open."
+        begin_batch()
+        return "OK, I will check your statements when you commit the batch."
+    # Checking for reliability statements:
+    # "[somebody] is a/an reliable/unreliable source."
+    # (which a batch may hold, as they need no index)
+    if command.kind == 'reliability':
+        items = command.items
+        store_reliability_statement(items[0], items[2], name)
+        return "" if batch is not None else "I understand."
+    if batch is not None:
+        return "Please commit the batch before asking me anything else."
     # Is a [category1] a [category2]?
-    result_match_object = query_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
-        last_statement = items
-        # check if they're a direct match
-        if isa_test1(items[1], items[3]):
-            # now we check if someone has qualified the 
-            # directly linked statement
-            isa_qualifiers = find_qualifiers(items[1], items[3])
-            if len(isa_qualifiers) >= 1:
-                resp = ""
-                qualifier = isa_qualifiers[0]
-                resp += qualifier + " "
-                for qualifier in isa_qualifiers[1:]:
-                    resp += "and " + qualifier + " "
-                if len(isa_qualifiers) > 1:
-                    resp += "say that it is."
-                else:
-                    resp += "says that it is."
-                print(resp)
-            else:
-                print("Yes, it is.")
-        # categories are not directly linked, so we check for
-        # an indirect link through ISA chains
-        elif isa_test(items[1], items[3]):
-            print("It's quite possible that " + ARTICLES[items[1]] + " " +\
-                    items[1] + " is " + ARTICLES[items[3]] + " " + items[3] + ".")
-        else:
-            print("I have no reason to believe so.")
-        return
-    result_match_object = what_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+    if command.kind == 'query':
+        items = command.items
+        session['last_statement'] = items
+        return hierarchy.cached_answer(kb, answer_query, items[1], items[3])
+    if command.kind == 'what':
+        items = command.items
         supersets = get_isa_list(items[1])
 
         if supersets != [] :
             first = supersets[0]
             a1 = get_article(items[1]).capitalize()
             a2 = get_article(first)
-            print(a1 + " " + items[1] + " is " + a2 + " " + first + ".")
-            return
+            return a1 + " " + items[1] + " is " + a2 + " " + first + "."
         else :
             subsets = get_includes_list(items[1])
             if subsets != [] :
                 first = subsets[0]
                 a1 = get_article(items[1]).capitalize()
                 a2 = get_article(first)
-                print(a1 + " " + items[1] + " is something more general than " + a2 + " " + first + ".")
-                return
+                return a1 + " " + items[1] + " is something more general than " + a2 + " " + first + "."
             else :
-                print("I don't know.")
-        return
-    result_match_object = why_pattern.match(info)
-    if result_match_object != None :
-        items = result_match_object.groups()
+                return "I don't know."
+    # "What is a [category], fully?"
+    if command.kind == 'fully':
+        items = command.items
+        session['listing'] = None
+        if get_isa_list(items[1]) == []:
+            return "I don't know."
+        session['listing'] = (get_article(items[1]).capitalize() + " " + items[1] + " is also ",
+                              hierarchy.walk_ancestors(kb, items[1]), [])
+        return get_article(items[1]).capitalize() + " " + items[1] + " is " + hierarchy.next_page(kb, session)
+    # "What are all the kinds of [category]?"
+    if command.kind == 'kinds':
+        items = command.items
+        session['listing'] = None
+        if get_includes_list(items[0]) == []:
+            return "I don't know of any kinds of " + items[0] + "."
+        session['listing'] = ("More kinds of " + items[0] + ": ", hierarchy.walk_descendants(kb, items[0]), [])
+        return "Kinds of " + items[0] + ": " + hierarchy.next_page(kb, session)
+    # "What do a [category1] and a [category2] have in common?"
+    if command.kind == 'common':
+        named = named_category_pattern.findall(command.items[0])
+        subject = ", ".join(article.lower() + " " + noun for article, noun in named[:-1]) +\
+                  " and " + named[-1][0].lower() + " " + named[-1][1]
+        shared = common_ancestors([noun for article, noun in named])
+        if shared == []:
+            return "As far as I know, " + subject + " have nothing in common."
+        return subject[0].upper() + subject[1:] + " are each " +\
+               " and ".join(get_article(category) + " " + category for category in shared) + "."
+    # "More."
+    if command.kind == 'more':
+        if session.get('listing') is None:
+            return "There is nothing more to list."
+        return session['listing'][0] + hierarchy.next_page(kb, session)
+    if command.kind == 'why':
+        items = command.items
         if not isa_test(items[1], items[3]) :
-            print("But that's not true, as far as I know!")
-        else:
-            answer_why(items[1], items[3])
-            last_statement = items
-        return
-    
-    # Checking for reliability statements:
-    # "[somebody] is a/an reliable/unreliable source."
-    result_match_object = reliability_pattern.match(info)
-    if result_match_object != None:
-        items = result_match_object.groups()
-        store_reliability_statement(items[0], items[2], name)
+            return "But that's not true, as far as I know!"
+        session['last_statement'] = items
+        return hierarchy.cached_answer(kb, answer_why, items[1], items[3])
 
-        print("I understand.")
-        return
 
     # Checking for reliabiltiy question:
     # "Why is [somebody] a/an reliable/unreliable source?"
     # "Is [somebody] a/an reliable/unreliable source?"
-    result_match_object = reliability_why_pattern.match(info)
-    if result_match_object != None:
-        items = result_match_object.groups()
+    if command.kind == 'reliability_why':
+        items = command.items
         why_q = (items[0] != None and items[0].lower() == 'why')
         name = items[1]
         reliability_term = items[3]
@@ -389,110 +820,126 @@ def process(info) :
         elif reliability_term == "unreliable":
             opposite_reliability = "unreliable"
         if name in RELIABILITY:
-            resp = ""
-            reliability_information = RELIABILITY[name]
-            if reliability_term in reliability_information:
-                if not why_q:
-                    resp += "Yes, "
-                else:
-                    resp += "Because "
-                reliability_qualifiers = reliability_information[reliability_term]
-                if len(reliability_qualifiers) >= 1:
-                    resp += reliability_qualifiers[0] + " "
-                    for person in reliability_qualifiers[1:]:
-                        resp += "and " + person + " "
-                else:
-                    resp += "you "
-                resp += "told me that."
-                print(resp)
-                return
-            resp += "I don't know if " + name + " is " + article + " " + reliability_term + " source"
-
-            if opposite_reliability in reliability_information:
-                opposite_reliability_qualifiers = reliability_information[opposite_reliability]
-                resp += ",\nbut "
-                if len(opposite_reliability_qualifiers) >= 1:
-                    resp += opposite_reliability_qualifiers[0] + " "
-                    for person in opposite_reliability_qualifiers[1:]:
-                        resp += "and " + person + " "
-                else:
-                    resp += "you "
-                resp += "told me that " + name + " is " + article + " " + opposite_reliability + " source"
-            resp += "."
-            print(resp)
-            return
-        print("I have no information about the reliability of " + name + ".")
-        return
+            return render(write_reliability, name, article, reliability_term, opposite_reliability, why_q)
+        return "I have no information about the reliability of " + name + "."
+
+    # "What does [somebody] say?"
+    if command.kind == 'sayings':
+        source = command.items[0]
+        facts = sorted(SOURCE_FACTS.get(source, ()))
+        if facts == []:
+            return "I have not heard anything from " + source + "."
+        return source + " says that " + render(write_facts, facts)
 
     # Checking for plausible argument:
     # "Why is it possible that [category1] is [category2?"
-    result_match_object = plausible_why_pattern.match(info)
-    if result_match_object != None:
-        items = result_match_object.groups()
-        print(report_chain_with_qualifiers(items[1], items[3]))
-        return
+    if command.kind == 'plausible_why':
+        items = command.items
+        return hierarchy.cached_answer(kb, report_chain_with_qualifiers, items[1], items[3])
     # Checking for other plausible argument:
     # "Why?"
     # Requires that a previous statement has been made
-    result_match_object = short_why_pattern.match(info)
-    if result_match_object != None:
+    if command.kind == 'short_why':
+        last_statement = session['last_statement']
         if last_statement is not None:
-            print(report_chain_with_qualifiers(last_statement[1], last_statement[3]))
-            return
-        last_statement = None
-    print("I do not understand.  You entered: ")
-    print(info)
+            return hierarchy.cached_answer(kb, report_chain_with_qualifiers, last_statement[1], last_statement[3])
+    # Checking for the minimize command:
+    # "Minimize the knowledge base."
+    if command.kind == 'minimize':
+        redundant = minimize_knowledge_base()
+        if redundant == []:
+            return "None of your statements are redundant."
+        return report_removed_links(redundant)
+    # Checking for snapshot commands:
+    # "Save the knowledge base to [filename]."
+    if command.kind == 'save':
+        filename = command.items[0]
+        try:
+            save_snapshot(kb, filename)
+            return "I saved the knowledge base to " + filename + "."
+        except OSError:
+            return "I could not write to " + filename + "."
+    # "Load the knowledge base from [filename]."
+    if command.kind == 'load':
+        filename = command.items[0]
+        try:
+            load_snapshot(kb, filename)
+            # The journal cannot describe the change, so it starts again from here.
+            if journal is not None: journal.restart()
+            return "I loaded the knowledge base from " + filename + "."
+        except (OSError, ValueError):
+            return "I could not load a knowledge base from " + filename + "."
+    # Checking for journal commands:
+    # "Keep a journal in [filename]."
+    if command.kind == 'journal':
+        filename = command.items[0]
+        if journal is not None:
+            journal.close()
+        try:
+            open_journal(kb, filename)
+            return "I will keep a journal in " + filename + "."
+        except (OSError, ValueError):
+            return "I could not keep a journal in " + filename + "."
+    # "Compact the journal."
+    if command.kind == 'compact':
+        if journal is None:
+            return "I am not keeping a journal."
+        elif journal.compact():
+            return "I am compacting the journal."
+        else:
+            return "The journal is already being compacted."
+    if command.kind == 'keep_statistics':
+        attach(kb)
+        return "I will keep statistics."
+    if command.kind == 'show_statistics':
+        if instruments is None:
+            return "I am not keeping statistics."
+        return instruments.dump()
+    return "I do not understand.  You entered: \n" + info
+
+def answer_query(category1, category2):
+    'Returns the answer to the question IS A CATEGORY1 A CATEGORY2?'
+    # check if they're a direct match
+    if isa_test1(category1, category2):
+        # now we check if someone has qualified the 
+        # directly linked statement
+        isa_qualifiers = find_qualifiers(category1, category2)
+        if len(isa_qualifiers) >= 1:
+            return render(write_says, isa_qualifiers) + "it is."
+        else:
+            return "Yes, it is."
+    # categories are not directly linked, so we check for
+    # an indirect link through ISA chains, and say how likely
+    # the most credible of them makes it
+    elif isa_test(category1, category2):
+        credibility = chain_credibility(most_credible_chain(category1, category2))
+        if credibility >= 0.5:
+            likelihood = "It's quite possible that "
+        elif credibility >= 0.2:
+            likelihood = "It's possible that "
+        else:
+            likelihood = "It's conceivable, but doubtful, that "
+        return likelihood + ARTICLES[category1] + " " +\
+                category1 + " is " + ARTICLES[category2] + " " + category2 + "."
+    else:
+        return "I have no reason to believe so."
 
 def answer_why(x, y):
-    'Handles the answering of a Why question.'
+    'Returns the answer to a Why question.'
     if x == y:
-        print("Because they are identical.")
-        return
+        return "Because they are identical."
     if isa_test1(x, y):
         # Check who qualified the statement
-        isa_qualifiers = find_qualifiers(x,y)
-        resp = "Because "
-        if len(isa_qualifiers) >= 1:
-            resp += isa_qualifiers[0] + " "
-            for qualifier in isa_qualifiers[1:]:
-                resp += "and " + qualifier + " "
-        else:
-            resp += "you "
-        resp += "told me that."
-        print(resp)
-        return
-    print("Because " + report_chain(x, y))
-    return
+        return "Because " + render(write_told_me, find_qualifiers(x, y))
+    return "Because " + report_chain(x, y)
 
-from functools import reduce
 def report_chain(x, y):
     'Returns a phrase that describes a chain of facts.'
-    chain = find_chain(x, y)
-    all_but_last = chain[0:-1]
-    last_link = chain[-1]
-    main_phrase = reduce(lambda x, y: x + y, map(report_link, all_but_last))
-    last_phrase = "and " + report_link(last_link)
-    new_last_phrase = last_phrase[0:-2] + '.'
-    return main_phrase + new_last_phrase
-
-def report_link(link, reportEnd = ", "):
-    'Returns a phrase that describes one fact.'
-    x = link[0]
-    y = link[1]
-    a1 = get_article(x)
-    a2 = get_article(y)
-    return a1 + " " + x + " is " + a2 + " " + y + reportEnd
+    return hierarchy.report_chain(kb, x, y)
 
 def find_chain(x, z):
     'Returns a list of lists, which each sublist representing a link.'
-    if isa_test1(x, z):
-        return [[x, z]]
-    else:
-        for y in get_isa_list(x):
-            if isa_test(y, z):
-                temp = find_chain(y, z)
-                temp.insert(0, [x,y])
-                return temp
+    return hierarchy.find_chain(kb, x, z)
 
 def test() :
     return
@@ -500,6 +947,14 @@ def test() :
     # process("Jones says that Smith is a reliable source.")
     # process("A dog is an animal.")
     # process("Jones is an unreliable source.")
-test()
-linneus()
+
+def main(arguments):
+    """
+    With no ARGUMENTS, runs the interactive loop. Otherwise each argument
+    names a file of commands ("-" for standard input) to answer in turn.
+    """
+    return console.main(kb, arguments)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
 
@@ -0,0 +1,147 @@
+# analytics.py
+# Works out, all at once, which categories of a knowledge base (Linneus3
+# or PlausibleArguments) are subsumed by which, for reports over the
+# whole hierarchy. Needs NumPy.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Each category is given an integer id, and the categories it is a are
+# kept as one row of bits, packed eight to a byte:
+#  rows[i, j >> 3] & (0x80 >> (j & 7))  is set when category i is a category j
+# The rows are filled in parents first, each being the OR of its parents'
+# rows and their own bits, so the closure costs one vectorized OR of a
+# row per fact; categories on (or below) a cycle are then refined until
+# nothing changes.
+# Usage: python analytics.py <module> <snapshot> <closure.tsv | closure.npz>
+
+from itertools import chain
+import importlib
+import sys
+
+import numpy as np
+
+from snapshot import load_snapshot
+
+class Reachability:
+    'The transitive closure of the ISA relation of one knowledge base, as a matrix of bits.'
+
+    def __init__(self, categories, rows):
+        self.categories = categories
+        self.ids = {category: i for i, category in enumerate(categories)}
+        self.rows = rows
+
+    def isa(self, category1, category2):
+        'Returns True if category 1 is a category 2.'
+        return bool(self.isa_many([(category1, category2)])[0])
+
+    def isa_many(self, pairs):
+        'Returns a boolean array saying, for each (category 1, category 2) pair, whether category 1 is a category 2.'
+        first = np.array([self.ids.get(pair[0], -1) for pair in pairs], dtype = np.int64)
+        second = np.array([self.ids.get(pair[1], -1) for pair in pairs], dtype = np.int64)
+        known = (first >= 0) & (second >= 0)
+        answers = np.zeros(len(first), dtype = bool)
+        i = first[known]
+        j = second[known]
+        answers[known] = (self.rows[i, j >> 3] & (0x80 >> (j & 7)).astype(np.uint8)) != 0
+        # As with isa_test, every category is itself.
+        same = np.array([pair[0] == pair[1] for pair in pairs], dtype = bool)
+        return answers | same
+
+    def ancestors(self, category1):
+        'Returns the list of every category CATEGORY1 is a.'
+        if category1 not in self.ids: return []
+        columns = np.flatnonzero(self.row_bits(self.ids[category1]))
+        return [self.categories[j] for j in columns]
+
+    def descendants(self, category1):
+        'Returns the list of every category that is a CATEGORY1.'
+        if category1 not in self.ids: return []
+        j = self.ids[category1]
+        rows = np.flatnonzero(self.rows[:, j >> 3] & (0x80 >> (j & 7)))
+        return [self.categories[i] for i in rows]
+
+    def matrix(self):
+        'Returns the whole closure as an unpacked boolean matrix (one byte per pair).'
+        return np.unpackbits(self.rows, axis = 1, count = len(self.categories)).astype(bool)
+
+    def count(self):
+        'Returns how many (category, ancestor) pairs the closure holds.'
+        return int(np.unpackbits(self.rows).sum())
+
+    def row_bits(self, i):
+        'Returns the unpacked bits of row I.'
+        return np.unpackbits(self.rows[i], count = len(self.categories))
+
+    def subsumptions(self):
+        'Yields every (category, ancestor) pair, one row at a time.'
+        for i, category in enumerate(self.categories):
+            for j in np.flatnonzero(self.row_bits(i)):
+                yield category, self.categories[j]
+
+    def export(self, filename):
+        """
+        Writes the closure to FILENAME: as the category names and packed
+        rows if it ends in .npz, and otherwise as one tab-separated
+        category and ancestor per line.
+        """
+        if filename.endswith('.npz'):
+            np.savez_compressed(filename, categories = np.array(self.categories, dtype = str),
+                                rows = self.rows)
+            return
+        with open(filename, 'w', encoding = 'utf-8') as output:
+            for category, ancestor in self.subsumptions():
+                output.write(category + '\t' + ancestor + '\n')
+
+def load_closure(filename):
+    'Returns the Reachability exported to the .npz file FILENAME.'
+    with np.load(filename) as exported:
+        return Reachability(exported['categories'].tolist(), exported['rows'])
+
+def reachability(kb):
+    'Returns the Reachability of the knowledge base held by the module KB.'
+    categories = list(dict.fromkeys(chain(kb.ISA, kb.INCLUDES)))
+    ids = {category: i for i, category in enumerate(categories)}
+    rows = np.zeros((len(categories), (len(categories) + 7) // 8), dtype = np.uint8)
+    parents = [np.array([ids[parent] for parent in kb.get_isa_list(category)], dtype = np.int64)
+               for category in categories]
+    # Parents first, as in reindex_categories.
+    waiting = [len(parent_ids) for parent_ids in parents]
+    ready = [i for i in range(len(categories)) if waiting[i] == 0]
+    while ready:
+        i = ready.pop()
+        include_parents(rows, i, parents[i])
+        for subcategory in kb.get_includes_list(categories[i]):
+            j = ids[subcategory]
+            waiting[j] -= 1
+            if waiting[j] == 0: ready.append(j)
+    # Whatever is left lies on or below a cycle; go round until settled.
+    unsettled = [i for i in range(len(categories)) if waiting[i] > 0]
+    changed = True
+    while changed:
+        changed = False
+        for i in unsettled:
+            before = rows[i].copy()
+            include_parents(rows, i, parents[i])
+            if not np.array_equal(before, rows[i]): changed = True
+    return Reachability(categories, rows)
+
+def include_parents(rows, i, parent_ids):
+    'Adds the parents PARENT_IDS of category I, and everything they are, to row I.'
+    if len(parent_ids) == 0: return
+    rows[i] |= np.bitwise_or.reduce(rows[parent_ids], axis = 0)
+    np.bitwise_or.at(rows[i], parent_ids >> 3, (0x80 >> (parent_ids & 7)).astype(np.uint8))
+
+def main(arguments):
+    'Loads a snapshot into a module and exports the closure of its ISA relation.'
+    if len(arguments) != 3:
+        print('Usage: python analytics.py <module> <snapshot> <closure.tsv | closure.npz>')
+        return
+    kb = importlib.import_module(arguments[0])
+    load_snapshot(kb, arguments[1])
+    closure = reachability(kb)
+    closure.export(arguments[2])
+    print(str(len(closure.categories)) + ' categories, ' + str(closure.count()) + ' subsumptions.')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,151 @@
+# benchmark.py
+# Times the reasoning of Linneus3 and PlausibleArguments on generated
+# taxonomies of growing size, and prints one JSON object per result so
+# that runs can be saved and compared.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# The taxonomies (see generate) are:
+#  chain:    c1 is a c0, c2 is a c1, ... one long line of categories
+#  fanout:   c1, c2, ... are all directly a c0
+#  diamonds: two categories at each level, both a member of both
+#            categories at the level above, so every pair of levels
+#            is joined by a diamond
+#  random:   every category is a member of one or two earlier ones
+# Every fact is asserted by QUALIFIERS_PER_FACT sources, and there is a
+# reliability statement about every source.
+# Usage: python benchmark.py [size ...] > results.jsonl
+
+import json
+import platform
+import random
+import sys
+import time
+
+import Linneus3
+import PlausibleArguments
+
+SHAPES = ['chain', 'fanout', 'diamonds', 'random']
+SIZES = [100, 1000, 10000]
+SOURCES = 20
+QUALIFIERS_PER_FACT = 3
+QUESTIONS = 1000
+REPEAT = 3
+
+def generate(shape, size, seed = 0):
+    'Returns the (category, supercategory) facts of a taxonomy of SHAPE with SIZE categories.'
+    rng = random.Random(seed)
+    facts = []
+    for i in range(1, size):
+        if shape == 'chain':
+            facts.append(('c' + str(i), 'c' + str(i - 1)))
+        elif shape == 'fanout':
+            facts.append(('c' + str(i), 'c0'))
+        elif shape == 'diamonds':
+            if i >= 2:
+                level = i // 2
+                facts.append(('c' + str(i), 'c' + str(2 * level - 2)))
+                facts.append(('c' + str(i), 'c' + str(2 * level - 1)))
+        elif shape == 'random':
+            parents = {rng.randrange(i) for _ in range(rng.choice((1, 1, 1, 2)))}
+            for parent in sorted(parents):
+                facts.append(('c' + str(i), 'c' + str(parent)))
+        else:
+            raise ValueError('Unknown shape: ' + shape)
+    return facts
+
+def assertions(kb, facts, seed = 0):
+    'Returns the sentences that teach KB the FACTS, with sources where it understands them.'
+    if not hasattr(kb, 'QUALIFIERS'):
+        return ['A ' + c1 + ' is a ' + c2 + '.' for c1, c2 in facts]
+    rng = random.Random(seed)
+    sentences = []
+    for c1, c2 in facts:
+        for source in rng.sample(range(SOURCES), QUALIFIERS_PER_FACT):
+            sentences.append('source' + str(source) + ' says that a ' + c1 + ' is a ' + c2 + '.')
+    for source in range(SOURCES):
+        label = 'reliable' if source % 3 else 'unreliable'
+        sentences.append('source' + str((source + 1) % SOURCES) + ' says that source' +
+                         str(source) + ' is a ' + label + ' source.')
+    return sentences
+
+def questions(facts, seed = 0):
+    'Returns QUESTIONS (category, supercategory) pairs that hold in the taxonomy of FACTS.'
+    parents = {}
+    for c1, c2 in facts:
+        parents.setdefault(c1, []).append(c2)
+    categories = sorted(parents)
+    if categories == []: return []
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(QUESTIONS):
+        category = start = rng.choice(categories)
+        # Climb a random distance, to a random depth.
+        for _ in range(rng.randrange(1, 64)):
+            if category not in parents: break
+            category = rng.choice(parents[category])
+        pairs.append((start, category))
+    return pairs
+
+def clear_knowledge_base(kb):
+    'Empties the knowledge base held by the module KB.'
+    for name in ('ISA', 'INCLUDES', 'ARTICLES', 'ANCESTORS', 'BITS', 'BIT_NAMES', 'QUALIFIERS', 'RELIABILITY',
+                 'SOURCE_SCORES', 'SOURCE_FACTS', 'LINK_SCORES', 'VOUCHES'):
+        if hasattr(kb, name): getattr(kb, name).clear()
+    kb.forget_answers()
+    kb.batch = None
+    kb.journal = None
+
+def timed(function, items, repeat = REPEAT):
+    'Returns the fastest of REPEAT times taken to call FUNCTION on each of ITEMS.'
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(*item)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+def benchmark(kb, shape, size):
+    'Yields a result for each operation timed on KB with a taxonomy of SHAPE and SIZE.'
+    clear_knowledge_base(kb)
+    facts = generate(shape, size)
+    sentences = assertions(kb, facts)
+    pairs = questions(facts)
+    # Assertions are timed through respond, which is process without the
+    # printing, and only once since they change the knowledge base.
+    yield 'process', len(sentences), timed(kb.respond, [(s,) for s in sentences], 1)
+    yield 'isa_test', len(pairs), timed(kb.isa_test, pairs)
+    yield 'find_chain', len(pairs), timed(kb.find_chain, pairs)
+    # report_chain only describes chains of two facts or more.
+    long_pairs = [pair for pair in pairs if len(kb.find_chain(*pair)) > 1]
+    if long_pairs != []:
+        yield 'report_chain', len(long_pairs), timed(kb.report_chain, long_pairs)
+    if hasattr(kb, 'indirect_redundancy'):
+        yield 'indirect_redundancy', len(facts), timed(kb.indirect_redundancy, facts)
+    if hasattr(kb, 'report_chain_with_qualifiers'):
+        yield 'report_chain_with_qualifiers', len(pairs), timed(kb.report_chain_with_qualifiers, pairs)
+    clear_knowledge_base(kb)
+
+def main(arguments):
+    'Runs every benchmark at the sizes given as ARGUMENTS (or SIZES) and prints the results.'
+    sizes = [int(size) for size in arguments] or SIZES
+    for kb in (Linneus3, PlausibleArguments):
+        for shape in SHAPES:
+            for size in sizes:
+                for operation, count, seconds in benchmark(kb, shape, size):
+                    print(json.dumps({
+                        'module': kb.__name__,
+                        'shape': shape,
+                        'size': size,
+                        'operation': operation,
+                        'count': count,
+                        'seconds': round(seconds, 6),
+                        'microseconds_each': round(seconds / max(count, 1) * 1e6, 3),
+                        'python': platform.python_version(),
+                    }), flush = True)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
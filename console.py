@@ -0,0 +1,67 @@
+# console.py
+# Holds a conversation with a knowledge base (Linneus3 or
+# PlausibleArguments), at the console or over files of commands.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Every function here takes the module that holds the knowledge base,
+# KB, and hands each sentence to its respond function.
+
+import sys
+from time import perf_counter
+
+def linneus(kb):
+    'The main loop; it gets and processes user input, until "bye".'
+    print('This is Linneus.  Please tell me "ISA" facts and ask questions.')
+    print('For example, you could tell me "An ant is an insect."')
+    while True :
+        info = input('Enter an ISA fact, or "bye" here: ')
+        if info == 'bye': return 'Goodbye now!'
+        process(kb, info)
+
+def process(kb, info) :
+    'Handles the user sentence, printing the response.'
+    response = kb.respond(info)
+    if response != "": print(response)
+
+def answer_command(kb, command, session = None) :
+    'Returns the response of KB to a parsed Command, as part of SESSION (by default, the console\'s).'
+    if session is None : session = kb.console_session
+    if kb.instruments is None: return kb.handle_command(command, session)
+    start = perf_counter()
+    response = kb.handle_command(command, session)
+    kb.instruments.record_command(command.kind, perf_counter() - start)
+    return response
+
+def run_commands(kb, lines):
+    'Yields the response to each command in LINES, stopping at "bye".'
+    for info in lines:
+        info = info.rstrip('\r\n')
+        if info == 'bye': return
+        yield kb.respond(info)
+
+def stream_commands(kb, infile, outfile):
+    'Answers every command read from INFILE, writing the responses to OUTFILE.'
+    for response in run_commands(kb, infile):
+        if response != "":
+            outfile.write(response)
+            outfile.write("\n")
+
+def main(kb, arguments):
+    """
+    With no ARGUMENTS, runs the interactive loop. Otherwise each argument
+    names a file of commands ("-" for standard input) to answer in turn.
+    """
+    if arguments == []:
+        kb.test()
+        return linneus(kb)
+    output = open(sys.stdout.fileno(), 'w', buffering = 1 << 16,
+                  encoding = sys.stdout.encoding, closefd = False)
+    with output:
+        for filename in arguments:
+            if filename == '-':
+                stream_commands(kb, sys.stdin, output)
+            else:
+                with open(filename) as commands:
+                    stream_commands(kb, commands, output)
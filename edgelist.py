@@ -0,0 +1,255 @@
+# edgelist.py
+# Reads and writes a knowledge base (Linneus3 or PlausibleArguments) as
+# a list of edges, as hypernym dumps are, storing each row straight into
+# the knowledge base rather than turning it into a sentence to be parsed.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Each row has the fields child, parent, article and source:
+#  hawk    bird              a   Jones   Jones says that a hawk is a bird.
+#  hawk    bird              a           A hawk is a bird.
+#  animal                    an          (the article of a category alone)
+#  Smith   reliable source       Jones   Jones says that Smith is a reliable source.
+# The article is the child's; a category stored without one is given
+# "a" or "an" by its spelling. The parent of a reliability statement is
+# "reliable source" or "unreliable source", which no category can be.
+# Files ending in .tsv hold tab-separated rows and .csv comma-separated
+# ones, either of which may begin with a header row naming the fields;
+# .jsonl files hold one JSON object per line, with the same field names.
+# Rows are read and written one at a time, so a dump of any size takes
+# no more memory than the knowledge base it fills, and a row that cannot
+# be understood is counted and skipped. Linneus3 has no sources, so it
+# leaves them out and counts reliability statements as bad rows. Facts
+# the others imply are kept, as they are sources' statements in their
+# own right, unless the import is asked to minimize the knowledge base.
+# Usage: python edgelist.py import <module> <edges> <snapshot> [--minimize]
+#        python edgelist.py export <module> <snapshot> <edges>
+
+from re import compile
+from snapshot import save_snapshot, load_snapshot
+import csv
+import importlib
+import json
+import os
+import sys
+
+FIELDS = ['child', 'parent', 'article', 'source']
+FORMATS = {'.tsv': 'tsv', '.tab': 'tsv', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+RELIABILITY_PARENTS = {'reliable source': 'reliable', 'unreliable source': 'unreliable'}
+# Names are what the sentence patterns accept.
+name_pattern = compile(r"^[-\w]+$")
+# Progress is reported once every this many rows.
+REPORT_EVERY = 100000
+
+def file_format(filename):
+    'Returns the format (tsv, csv or jsonl) of the edge list FILENAME, judged by its extension.'
+    try:
+        return FORMATS[os.path.splitext(filename)[1].lower()]
+    except KeyError:
+        raise ValueError(filename + ' is not a .tsv, .csv or .jsonl file')
+
+def import_edges(kb, filename, progress = None, report_every = REPORT_EVERY, minimize = False):
+    """
+    Stores every row of the edge list FILENAME in the knowledge base held
+    by the module KB, as one batch (or as part of the batch already open),
+    and returns the counts of each kind of row. PROGRESS, if given, is
+    called with the counts so far every REPORT_EVERY rows. The facts are
+    only indexed when the batch is committed: imported facts, and the
+    sources behind them, are removed as redundant only if MINIMIZE is True.
+    """
+    format = file_format(filename)
+    counts = {'rows': 0, 'facts': 0, 'articles': 0, 'reliability': 0, 'bad': 0, 'first_bad': None}
+    own_batch = kb.batch is None
+    if own_batch: kb.begin_batch()
+    try:
+        with open(filename, encoding = 'utf-8', errors = 'replace', newline = '') as edges:
+            for line, row in read_rows(edges, format):
+                counts['rows'] += 1
+                kind = None if row is None else store_row(kb, *row)
+                if kind is None:
+                    counts['bad'] += 1
+                    if counts['first_bad'] is None: counts['first_bad'] = line
+                else:
+                    counts[kind] += 1
+                if progress is not None and counts['rows'] % report_every == 0:
+                    progress(counts)
+    finally:
+        # Whatever was stored before a failure is still committed.
+        if own_batch: counts['batch'] = kb.commit_batch(minimize)
+    return counts
+
+def read_rows(edges, format):
+    """
+    Yields the line number and the (child, parent, article, source) fields
+    of each row of the open file EDGES, or None for a row that cannot be read.
+    """
+    if format == 'jsonl':
+        for line, text in enumerate(edges, 1):
+            if text.strip() == '': continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                yield line, None
+                continue
+            yield line, tuple('' if row.get(name) is None else str(row[name]).strip() for name in FIELDS)
+        return
+    if format == 'tsv':
+        reader = csv.reader(edges, delimiter = '\t', quoting = csv.QUOTE_NONE)
+    else:
+        reader = csv.reader(edges)
+    # Where each field is in a row; a field a header leaves out is read
+    # from the empty column added to the end of every row.
+    width = len(FIELDS)
+    child, parent, article, source = range(width)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            yield reader.line_num, None
+            continue
+        if row == []: continue
+        if reader.line_num == 1 and 'child' in [field.strip().lower() for field in row]:
+            header = [field.strip().lower() for field in row]
+            width = len(header)
+            child, parent, article, source = [header.index(name) if name in header else width
+                                              for name in FIELDS]
+            continue
+        if len(row) > width:
+            yield reader.line_num, None
+            continue
+        row += [''] * (width + 1 - len(row))
+        yield reader.line_num, (row[child].strip(), row[parent].strip(),
+                                row[article].strip(), row[source].strip())
+
+def store_row(kb, child, parent, article, source):
+    'Stores one row in KB; returns which count it belongs in (facts, articles or reliability), or None if it is bad.'
+    article = article.lower()
+    if not name_pattern.match(child) or article not in ('', 'a', 'an'): return None
+    if source != '' and not name_pattern.match(source): return None
+    if parent in RELIABILITY_PARENTS:
+        if not hasattr(kb, 'store_reliability_statement'): return None
+        kb.store_reliability_statement(child, RELIABILITY_PARENTS[parent], source or None)
+        return 'reliability'
+    if parent == '':
+        if article == '': return None
+        kb.store_article(child, article)
+        return 'articles'
+    if not name_pattern.match(parent): return None
+    store_article(kb, child, article)
+    store_article(kb, parent, '')
+    store_fact(kb, child, parent, source or None)
+    return 'facts'
+
+def store_article(kb, noun, article):
+    'Stores the ARTICLE of NOUN, or if none is given and none is known, one chosen by its spelling.'
+    if article == '':
+        if kb.get_article(noun) != '': return
+        article = 'an' if noun[0].lower() in 'aeiou' else 'a'
+    kb.store_article(noun, article)
+
+def store_fact(kb, child, parent, source):
+    'Stores the fact that a CHILD is a PARENT (according to SOURCE) in the open batch, as an assertion would be.'
+    batch = kb.batch
+    if kb.isa_test1(child, parent) and\
+       (not hasattr(kb, 'qualifier_for_chain') or kb.qualifier_for_chain(child, parent, source)):
+        batch['repeated'] += 1
+    elif child == parent:
+        batch['trivial'] += 1
+    else:
+        if hasattr(kb, 'QUALIFIERS'):
+            kb.store_isa_fact(child, parent, source)
+        else:
+            kb.store_isa_fact(child, parent)
+        batch['stored'] += 1
+
+def export_edges(kb, filename, progress = None, report_every = REPORT_EVERY):
+    """
+    Writes every fact, article and reliability statement of the knowledge
+    base held by the module KB to the edge list FILENAME, and returns how
+    many rows were written. PROGRESS, if given, is called with the count
+    so far every REPORT_EVERY rows.
+    """
+    format = file_format(filename)
+    counts = {'rows': 0}
+    with open(filename, 'w', encoding = 'utf-8', newline = '') as edges:
+        if format == 'jsonl':
+            def write(row):
+                edges.write(json.dumps(dict(zip(FIELDS, row))) + '\n')
+        else:
+            if format == 'tsv':
+                writer = csv.writer(edges, delimiter = '\t', quoting = csv.QUOTE_NONE, lineterminator = '\n')
+            else:
+                writer = csv.writer(edges, lineterminator = '\n')
+            writer.writerow(FIELDS)
+            write = writer.writerow
+        for row in edge_rows(kb):
+            write(row)
+            counts['rows'] += 1
+            if progress is not None and counts['rows'] % report_every == 0:
+                progress(counts)
+    return counts['rows']
+
+def edge_rows(kb):
+    'Yields a (child, parent, article, source) row for every fact, article and reliability statement of KB.'
+    for category1 in kb.ISA:
+        for category2 in kb.ISA[category1]:
+            sources = kb.find_qualifiers(category1, category2) if hasattr(kb, 'find_qualifiers') else []
+            for source in sources or ['']:
+                yield category1, category2, kb.get_article(category1), source
+    # The articles of categories that are not a child in any row.
+    for noun in kb.ARTICLES:
+        if kb.get_isa_list(noun) == []:
+            yield noun, '', kb.ARTICLES[noun], ''
+    reliability = getattr(kb, 'RELIABILITY', {})
+    for target in reliability:
+        for label, sources in reliability[target].items():
+            for source in sources or ['']:
+                yield target, label + ' source', '', source
+
+def show_progress(counts):
+    'Reports how many rows have been handled so far on the standard error.'
+    print(str(counts['rows']) + ' rows...', file = sys.stderr, flush = True)
+
+def main(arguments):
+    'Imports an edge list into a snapshot, or exports a snapshot as an edge list.'
+    minimize = '--minimize' in arguments
+    arguments = [argument for argument in arguments if argument != '--minimize']
+    if len(arguments) != 4 or arguments[0] not in ('import', 'export'):
+        print('Usage: python edgelist.py import <module> <edges> <snapshot> [--minimize]')
+        print('       python edgelist.py export <module> <snapshot> <edges>')
+        return
+    kb = importlib.import_module(arguments[1])
+    try:
+        convert(kb, *arguments, minimize = minimize)
+    except (OSError, ValueError) as error:
+        print(error)
+
+def convert(kb, direction, name, first, second, minimize = False):
+    'Carries out one import or export for main.'
+    if direction == 'export':
+        load_snapshot(kb, first)
+        rows = export_edges(kb, second, show_progress)
+        print(str(rows) + ' rows written to ' + second + '.')
+        return
+    # An existing snapshot is added to rather than replaced.
+    if os.path.exists(second):
+        load_snapshot(kb, second)
+    counts = import_edges(kb, first, show_progress, minimize = minimize)
+    save_snapshot(kb, second)
+    finished = counts['batch']
+    print(str(counts['rows']) + ' rows: ' + str(counts['facts']) + ' facts (' +
+          str(finished['stored']) + ' new), ' + str(counts['articles']) + ' articles, ' +
+          str(counts['reliability']) + ' reliability statements.')
+    if len(finished['redundant']) > 0:
+        print(str(len(finished['redundant'])) + ' redundant facts were removed.')
+    if counts['bad'] > 0:
+        print('Rows that could not be read: ' + str(counts['bad']) + ' (the first on line ' +
+              str(counts['first_bad']) + ').')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,436 @@
+# hierarchy.py
+# Keeps and searches the ISA hierarchy of a knowledge base (Linneus3 or
+# PlausibleArguments): the index over it, listings, chains of facts,
+# articles, batches and the answers already given.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Every function here takes the module that holds the knowledge base,
+# KB, as its first argument, and works on its dictionaries (ISA,
+# INCLUDES, ANCESTORS, BITS, ARTICLES, ANSWERS and CHANGED), on its
+# list BIT_NAMES and on its generation, batch, journal and instruments. Storing and removing a
+# fact, and answering a sentence, differ between the two modules, and
+# each keeps its own.
+
+from itertools import islice
+import sys
+
+from render import render, write_series
+
+# Long listings are given this many categories at a time.
+PAGE_SIZE = 20
+
+# At most this many answers are kept in ANSWERS.
+ANSWER_CACHE_SIZE = 10000
+
+def get_isa_list(kb, category1):
+    'Retrieves any existing list of things that CATEGORY1 is a'
+    try:
+        c1list = kb.ISA[category1]
+        return c1list
+    except:
+        return []
+
+def get_includes_list(kb, category1):
+    'Retrieves any existing list of things that CATEGORY1 includes'
+    try:
+        c1list = kb.INCLUDES[category1]
+        return c1list
+    except:
+        return []
+
+# The ANCESTORS dictionary is a reachability index over ISA. Every
+# category that is a supercategory of something is given a bit of its
+# own, numbered in the BITS dictionary (BIT_NAMES lists them back in
+# order), and each entry of ANCESTORS is an integer holding the bit of
+# every category its key is a member of, directly or through a chain
+# of ISA facts:
+#  ('hawk' : bit of raptor | bit of bird | bit of animal)
+# An entry takes one bit for each category numbered up to its highest
+# ancestor, where a set took some 48 bytes for each ancestor, so a chain
+# 6000 categories deep is indexed in a few megabytes rather than 860.
+# (It still grows with the square of the depth: a chain 20000 deep takes
+# 27 megabytes.) isa_test is one AND, and common_ancestors one AND
+# for each category asked about. The index is kept up to date as facts
+# are stored and removed, and rebuilt (see rebuild_index) when a whole
+# knowledge base is loaded, rather than being saved with it.
+
+def get_bit(kb, category1):
+    'Returns the bit of CATEGORY1, giving it one first if it has none.'
+    try:
+        return kb.BITS[category1]
+    except KeyError:
+        bit = kb.BITS[category1] = 1 << len(kb.BIT_NAMES)
+        kb.BIT_NAMES.append(category1)
+        return bit
+
+def has_ancestor(kb, category1, category2):
+    'Returns True if the index holds that CATEGORY1 is (indirectly) a CATEGORY2.'
+    return kb.ANCESTORS.get(category1, 0) & kb.BITS.get(category2, 0) != 0
+
+def get_ancestors(kb, category1):
+    'Retrieves the list of every category that CATEGORY1 is (indirectly) a, from the index'
+    names = kb.BIT_NAMES
+    digits = bin(kb.ANCESTORS.get(category1, 0))[:1:-1]
+    return [names[i] for i, digit in enumerate(digits) if digit == '1']
+
+def count_ancestors(kb, category1):
+    'Returns how many categories CATEGORY1 is (indirectly) a.'
+    return bin(kb.ANCESTORS.get(category1, 0)).count('1')
+
+def search_ancestors(kb, category1):
+    'Walks the ISA lists upward and returns every category CATEGORY1 is a'
+    found = set()
+    pending = [category1]
+    while pending:
+        for supercategory in get_isa_list(kb, pending.pop()):
+            if supercategory not in found:
+                found.add(supercategory)
+                pending.append(supercategory)
+    return found
+
+def get_descendants(kb, category1):
+    'Walks the INCLUDES lists downward and returns every category that is a CATEGORY1'
+    found = set()
+    pending = [category1]
+    while pending:
+        for subcategory in get_includes_list(kb, pending.pop()):
+            if subcategory not in found:
+                found.add(subcategory)
+                pending.append(subcategory)
+    return found
+
+def index_isa_fact(kb, category1, category2):
+    'Adds CATEGORY2 and its ancestors to CATEGORY1 and everything below it.'
+    new_ancestors = kb.ANCESTORS.get(category2, 0) | get_bit(kb, category2)
+    pending = [category1]
+    while pending:
+        category = pending.pop()
+        known = kb.ANCESTORS.get(category, 0)
+        # Anything below a category that already has them has them too.
+        if new_ancestors & ~known == 0: continue
+        kb.ANCESTORS[category] = known | new_ancestors
+        pending.extend(get_includes_list(kb, category))
+
+def unindex_isa_fact(kb, category1, category2):
+    'Brings the index up to date once the fact that a CATEGORY1 is a CATEGORY2 has been removed.'
+    # If CATEGORY2 is still reachable some other way, nothing changes.
+    if not has_ancestor(kb, category1, category1):
+        for parent in get_isa_list(kb, category1):
+            if parent == category2 or has_ancestor(kb, parent, category2):
+                return
+    reindex_categories(kb, get_descendants(kb, category1) | {category1})
+
+def reindex_categories(kb, categories):
+    'Recomputes the ANCESTORS entries of CATEGORIES from their ISA lists.'
+    # Entries outside CATEGORIES are still valid, so the entries inside
+    # are rebuilt parents-first from their direct supercategories.
+    waiting = {}
+    for category in categories:
+        waiting[category] = len([parent for parent in get_isa_list(kb, category)
+                                 if parent in categories])
+    ready = [category for category in waiting if waiting[category] == 0]
+    while ready:
+        category = ready.pop()
+        del waiting[category]
+        ancestors = 0
+        for parent in get_isa_list(kb, category):
+            ancestors |= get_bit(kb, parent) | kb.ANCESTORS.get(parent, 0)
+        kb.ANCESTORS[category] = ancestors
+        for subcategory in get_includes_list(kb, category):
+            if subcategory in waiting:
+                waiting[subcategory] -= 1
+                if waiting[subcategory] == 0: ready.append(subcategory)
+    # Whatever is left lies on or below a cycle; search those directly.
+    for category in waiting:
+        ancestors = 0
+        for ancestor in search_ancestors(kb, category):
+            ancestors |= get_bit(kb, ancestor)
+        kb.ANCESTORS[category] = ancestors
+
+def rebuild_index(kb):
+    'Builds the index afresh from the ISA lists, as when a whole knowledge base has been loaded.'
+    kb.ANCESTORS.clear()
+    kb.BITS.clear()
+    kb.BIT_NAMES.clear()
+    reindex_categories(kb, set(kb.ISA) | set(kb.INCLUDES))
+
+def walk_ancestors(kb, category1):
+    'Yields every category CATEGORY1 is a, one at a time.'
+    return walk(category1, kb.ISA, kb.INCLUDES)
+
+def walk_descendants(kb, category1):
+    'Yields every category that is a CATEGORY1, one at a time.'
+    return walk(category1, kb.INCLUDES, kb.ISA)
+
+def walk(category1, neighbours, others):
+    """
+    Yields every category reached from CATEGORY1 over the lists in the
+    dictionary NEIGHBOURS, depth first and each only once. Only the
+    categories that can be reached in more than one way (with more than
+    one entry in OTHERS) need to be remembered, so walking a tree takes
+    memory in proportion to its depth. A listing is walked a page at a
+    time, and the knowledge base may change in between, so each list of
+    neighbours is copied before it is walked.
+    """
+    seen = {category1}
+    stack = [iter(list(neighbours.get(category1, ())))]
+    while stack:
+        category = next(stack[-1], None)
+        if category is None:
+            stack.pop()
+        elif category not in seen:
+            if len(others.get(category, ())) > 1: seen.add(category)
+            yield category
+            stack.append(iter(list(neighbours.get(category, ()))))
+
+def next_page(kb, session):
+    'Returns the next page of the listing SESSION is in the middle of.'
+    # One category more than the page holds is taken, to tell whether
+    # there are any left, and held over for the next page.
+    continuation, categories, held = session['listing']
+    page = held + list(islice(categories, PAGE_SIZE + 1 - len(held)))
+    if len(page) > PAGE_SIZE:
+        session['listing'] = (continuation, categories, [page.pop()])
+        end = ', ...\n(Say "More." to hear the rest.)'
+    else:
+        session['listing'] = None
+        end = "."
+    return ", ".join(get_article(kb, category) + " " + category for category in page) + end
+
+def isa_test(kb, category1, category2):
+    'Returns True if category 1 is a subset of category 2'
+    if kb.instruments is not None: kb.instruments.record_search('isa_test', 1, 0, 0)
+    if category1 == category2 : return True
+    return kb.ANCESTORS.get(category1, 0) & kb.BITS.get(category2, 0) != 0
+
+def common_ancestors(kb, categories):
+    'Returns the most specific categories that every one of CATEGORIES is, in alphabetical order.'
+    # Here each category counts as one of its own ancestors, so that a
+    # hawk and a bird have the bird in common. The categories every one
+    # of CATEGORIES is are the bits their ANCESTORS entries all share.
+    categories = set(categories)
+    if categories == set(): return []
+    if kb.instruments is not None: kb.instruments.record_search('common_ancestors', len(categories), 0, 0)
+    # A category with no bit is no other category's ancestor, so it is
+    # only shared when it is the only one.
+    if len(categories) == 1 and not categories & kb.BITS.keys(): return list(categories)
+    shared = -1
+    for category in categories:
+        shared &= kb.ANCESTORS.get(category, 0) | kb.BITS.get(category, 0)
+    names = kb.BIT_NAMES
+    candidates = [names[i] for i, digit in enumerate(bin(shared)[:1:-1]) if digit == '1']
+    # A category below another is everything the other is and more, so
+    # taking the candidates with the most ancestors first, each is most
+    # specific unless it is an ancestor of one already taken.
+    found = []
+    covered = 0
+    for candidate in sorted(candidates, key = lambda category: (-count_ancestors(kb, category) -
+                                                                (not has_ancestor(kb, category, category)),
+                                                                category)):
+        if kb.BITS[candidate] & covered == 0:
+            found.append(candidate)
+            covered |= kb.ANCESTORS.get(candidate, 0)
+    return sorted(found)
+
+def shortest_chain(kb, category1, category2):
+    'Returns the shortest list of categories leading from category1 up to category2, or [].'
+    if category1 == category2 : return [category1]
+    if not isa_test(kb, category1, category2) : return []
+    # Search up from category1 over ISA and down from category2 over
+    # INCLUDES at the same time, always growing the smaller frontier.
+    # Only categories that lie between the two are ever visited.
+    up = {category1: (None, 0)}
+    down = {category2: (None, 0)}
+    up_frontier = [category1]
+    down_frontier = [category2]
+    meeting = None
+    while meeting is None and up_frontier and down_frontier:
+        if len(up_frontier) <= len(down_frontier):
+            up_frontier, meeting = grow_frontier(up_frontier, up, down, kb.ISA,
+                lambda category: category == category2 or has_ancestor(kb, category, category2))
+        else:
+            down_frontier, meeting = grow_frontier(down_frontier, down, up, kb.INCLUDES,
+                lambda category: category == category1 or has_ancestor(kb, category1, category))
+    if kb.instruments is not None: record_chain_search(kb, up, down)
+    if meeting is None : return []
+    # Follow the parent pointers back out to both ends.
+    chain = []
+    category = meeting
+    while category is not None:
+        chain.insert(0, category)
+        category = up[category][0]
+    category = down[meeting][0]
+    while category is not None:
+        chain.append(category)
+        category = down[category][0]
+    return chain
+
+def record_chain_search(kb, up, down):
+    'Tells the instruments how much of the hierarchy a shortest_chain search reached.'
+    edges = 0
+    for category in up: edges += len(get_isa_list(kb, category))
+    for category in down: edges += len(get_includes_list(kb, category))
+    depth = max(entry[1] for entry in up.values()) + max(entry[1] for entry in down.values())
+    kb.instruments.record_search('shortest_chain', len(up) + len(down), edges, depth)
+
+def grow_frontier(frontier, reached, other_reached, neighbours, on_the_way):
+    'Expands one level of a search over the lists in NEIGHBOURS; returns the next frontier and the best meeting point.'
+    next_frontier = []
+    meeting = None
+    for category in frontier:
+        distance = reached[category][1] + 1
+        for neighbour in neighbours.get(category, ()):
+            if neighbour in reached or not on_the_way(neighbour): continue
+            reached[neighbour] = (category, distance)
+            next_frontier.append(neighbour)
+            if neighbour in other_reached:
+                if meeting is None or distance + other_reached[neighbour][1] <\
+                   reached[meeting][1] + other_reached[meeting][1]:
+                    meeting = neighbour
+    return next_frontier, meeting
+
+def find_chain(kb, x, z):
+    'Returns a list of lists, which each sublist representing a link.'
+    chain = shortest_chain(kb, x, z)
+    return [[chain[i], chain[i + 1]] for i in range(len(chain) - 1)]
+
+def report_chain(kb, x, y):
+    'Returns a phrase that describes a chain of facts.'
+    return render(write_chain, kb, x, y)
+
+def write_chain(out, kb, x, y):
+    'Writes a phrase that describes the chain of facts from X up to Y to the writer OUT.'
+    write_series(out, find_chain(kb, x, y), lambda out, link: write_link(out, kb, link), ", ", ", and ")
+    out.write(".")
+
+def write_link(out, kb, link):
+    'Writes a phrase that describes one fact.'
+    out.write(report_link(kb, link, ""))
+
+def report_link(kb, link, reportEnd = ", "):
+    'Returns a phrase that describes one fact.'
+    x = link[0]
+    y = link[1]
+    a1 = get_article(kb, x)
+    a2 = get_article(kb, y)
+    return a1 + " " + x + " is " + a2 + " " + y + reportEnd
+
+def store_article(kb, noun, article):
+    'Saves the article (in lower-case) associated with a noun.'
+    if get_article(kb, noun) == article.lower(): return
+    noun = sys.intern(noun)
+    kb.ARTICLES[noun] = sys.intern(article.lower())
+    touch(kb, noun)
+    if kb.journal is not None:
+        kb.journal.append('article', noun, article.lower())
+
+def get_article(kb, noun):
+    'Returns the article associated with the noun, or if none, the empty string.'
+    # Most nouns are new when their articles are first stored, so this
+    # is asked of a missing noun about as often as of a known one.
+    return kb.ARTICLES.get(noun, '')
+
+def redundant_isa_fact(kb, category1, category2):
+    'Returns True if category 1 also reaches category 2 through another supercategory.'
+    # On a cycle the index cannot tell whether that other route runs
+    # back through this very fact, so such facts are kept.
+    if has_ancestor(kb, category1, category1): return False
+    for parent in get_isa_list(kb, category1):
+        if parent != category2 and has_ancestor(kb, parent, category2):
+            return True
+    return False
+
+def implied_facts(kb):
+    'Returns every stored link that the others imply, each as [category1, category2].'
+    # A link is implied by the others exactly when its supercategory is
+    # also reached through another direct supercategory.
+    redundant = []
+    for category in list(kb.ISA):
+        for parent in get_isa_list(kb, category):
+            if redundant_isa_fact(kb, category, parent):
+                redundant.append([category, parent])
+    return redundant
+
+def remove_redundant_facts(kb, candidates):
+    'Removes each of the links CANDIDATES that the others still imply; returns the links removed.'
+    # Two supercategories on a cycle each reach the other, so the links to
+    # both look redundant, but only one of them may go: each link is
+    # checked again against what is left before it is removed.
+    removed = []
+    for link in candidates:
+        if redundant_isa_fact(kb, link[0], link[1]):
+            kb.remove_isa_fact(link[0], link[1], False)
+            removed.append(link)
+    # One category may lose thousands of subcategories, so rather than
+    # each being looked for in its INCLUDES list in turn, every list is
+    # filtered once at the end. (Nothing above reads INCLUDES: a
+    # redundant link leaves the index as it was.)
+    unincluded = {}
+    for link in removed:
+        unincluded.setdefault(link[1], set()).add(link[0])
+    for category2, subcategories in unincluded.items():
+        kb.INCLUDES[category2][:] = [category for category in kb.INCLUDES[category2]
+                                     if category not in subcategories]
+    return removed
+
+def begin_batch(kb):
+    'Starts storing assertions without indexing each one.'
+    kb.batch = {'stored': 0, 'repeated': 0, 'trivial': 0, 'touched': set()}
+
+def commit_batch(kb, minimize):
+    'Indexes (and if MINIMIZE is True, minimizes) everything stored since begin_batch; returns the batch counts.'
+    finished = kb.batch
+    kb.batch = None
+    # Only the categories given a new supercategory, and everything
+    # below them, can have gained ancestors.
+    affected = set()
+    for category in finished['touched']:
+        if category not in affected:
+            affected |= get_descendants(kb, category) | {category}
+    reindex_categories(kb, affected)
+    finished['redundant'] = kb.minimize_knowledge_base() if minimize else []
+    return finished
+
+def touch(kb, category1):
+    'Starts a new generation, in which something about CATEGORY1 has changed.'
+    kb.generation += 1
+    kb.CHANGED[category1] = kb.generation
+
+def changed_since(kb, category1, category2, stamp):
+    'Returns True if anything an answer about CATEGORY1 and CATEGORY2 rests on has changed since generation STAMP.'
+    # That is the two categories and every category between them, or,
+    # if there is no chain between them, every category above CATEGORY1.
+    changed = kb.CHANGED
+    if changed.get(category1, 0) > stamp or changed.get(category2, 0) > stamp: return True
+    between = has_ancestor(kb, category1, category2)
+    for ancestor in get_ancestors(kb, category1):
+        if changed.get(ancestor, 0) > stamp:
+            if not between or ancestor == category2 or has_ancestor(kb, ancestor, category2):
+                return True
+    return False
+
+def cached_answer(kb, function, category1, category2):
+    'Returns FUNCTION(CATEGORY1, CATEGORY2), reusing the answer in ANSWERS unless what it rests on has changed.'
+    answers = kb.ANSWERS
+    key = (function.__name__, category1, category2)
+    try:
+        stamp, response = answers[key]
+        if not changed_since(kb, category1, category2, stamp):
+            answers.move_to_end(key)
+            return response
+    except KeyError:
+        pass
+    stamp = kb.generation
+    response = function(category1, category2)
+    answers[key] = (stamp, response)
+    answers.move_to_end(key)
+    if len(answers) > ANSWER_CACHE_SIZE:
+        answers.popitem(last = False)
+    return response
+
+def forget_answers(kb):
+    'Forgets every answer in ANSWERS, as when the whole knowledge base is replaced.'
+    kb.ANSWERS.clear()
+    kb.CHANGED.clear()
@@ -0,0 +1,97 @@
+# instrument.py
+# Measures a knowledge base (Linneus3 or PlausibleArguments) at work:
+# how long each kind of command takes, and how much of the hierarchy
+# each search has to look at.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Nothing is measured until instruments are attached to a module, e.g.
+#  instruments = attach(PlausibleArguments)
+#  ...
+#  print(instruments.dump())
+# or the user says "Keep statistics." and later "Show the statistics."
+# Until then the module only pays for one test against None per command
+# and per search.
+
+from threading import Lock
+import json
+
+# Latencies are counted in buckets by powers of two: bucket i holds the
+# commands that took under 2**i microseconds, the last one everything slower.
+BUCKETS = 25
+
+class Instruments:
+    'The latency histograms and search counters gathered from one knowledge base.'
+
+    def __init__(self):
+        self.lock = Lock()
+        self.commands = {}
+        self.searches = {}
+
+    def record_command(self, kind, seconds):
+        'Counts one command of KIND that took SECONDS.'
+        bucket = min(int(seconds * 1e6).bit_length(), BUCKETS - 1)
+        with self.lock:
+            try:
+                entry = self.commands[kind]
+            except KeyError:
+                entry = self.commands[kind] = {'count': 0, 'seconds': 0.0,
+                                               'slowest': 0.0, 'histogram': [0] * BUCKETS}
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['slowest'] = max(entry['slowest'], seconds)
+            entry['histogram'][bucket] += 1
+
+    def record_search(self, name, nodes, edges, depth):
+        'Counts one search by the function NAME that visited NODES and EDGES, DEPTH levels deep.'
+        with self.lock:
+            try:
+                entry = self.searches[name]
+            except KeyError:
+                entry = self.searches[name] = {'calls': 0, 'nodes': 0, 'edges': 0, 'deepest': 0}
+            entry['calls'] += 1
+            entry['nodes'] += nodes
+            entry['edges'] += edges
+            entry['deepest'] = max(entry['deepest'], depth)
+
+    def report(self):
+        'Returns everything measured so far as a dictionary.'
+        with self.lock:
+            commands = {}
+            for kind, entry in self.commands.items():
+                histogram = {}
+                for bucket, count in enumerate(entry['histogram']):
+                    if count == 0: continue
+                    if bucket == BUCKETS - 1:
+                        histogram['slower'] = count
+                    else:
+                        histogram['under ' + str(2 ** bucket) + 'us'] = count
+                commands[kind] = {'count': entry['count'],
+                                  'mean_seconds': entry['seconds'] / entry['count'],
+                                  'slowest_seconds': entry['slowest'],
+                                  'histogram': histogram}
+            searches = {name: dict(entry) for name, entry in self.searches.items()}
+        return {'commands': commands, 'searches': searches}
+
+    def dump(self):
+        'Returns everything measured so far as JSON.'
+        return json.dumps(self.report(), indent = 1, sort_keys = True)
+
+    def reset(self):
+        'Forgets everything measured so far.'
+        with self.lock:
+            self.commands.clear()
+            self.searches.clear()
+
+def attach(kb):
+    'Starts measuring the knowledge base held by the module KB and returns its Instruments.'
+    if kb.instruments is None:
+        kb.instruments = Instruments()
+    return kb.instruments
+
+def detach(kb):
+    'Stops measuring the module KB and returns the Instruments it had, if any.'
+    instruments = kb.instruments
+    kb.instruments = None
+    return instruments
@@ -0,0 +1,243 @@
+# journal.py
+# Keeps an append-only log of every change made to a knowledge base
+# (Linneus3 or PlausibleArguments), so that it can be recovered after a
+# restart or a crash without replaying the original sentences.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# A journal named BASE is a set of numbered files:
+#  BASE.<n>.snap: a snapshot holding every change logged before log n
+#  BASE.<n>.log:  the changes made after that, one record per line
+# Each record is a CRC-32 checksum followed by a JSON list, e.g.
+#  1c291ca3 ["isa", "hawk", "bird", "Jones"]
+# so that a line torn by a crash can be recognised and dropped.
+# Compaction starts a new log and folds everything before it into a new
+# snapshot; once that snapshot is safely on disk the older files go.
+# Loading a snapshot replaces the whole knowledge base, which no record
+# describes, so the journal is then restarted from a new snapshot.
+
+from snapshot import save_snapshot, load_snapshot
+from threading import Lock, Timer
+from zlib import crc32
+import glob
+import json
+import os
+
+# The knowledge base function that replays each kind of record.
+OPERATIONS = {
+    'isa': 'store_isa_fact',
+    'remove': 'remove_isa_fact',
+    'article': 'store_article',
+    'reliability': 'store_reliability_statement',
+}
+
+class Journal:
+    'An open journal that logs the changes made to one knowledge base module.'
+
+    def __init__(self, kb, base, number, sync_every = 64, sync_interval = 1.0):
+        self.kb = kb
+        self.base = base
+        self.number = number
+        # Every record is handed to the operating system as soon as it is
+        # logged, so it survives this process crashing. It is forced onto
+        # the disk, to survive the system crashing too, once SYNC_EVERY
+        # records are waiting, or by a timer SYNC_INTERVAL seconds after
+        # the first of them was logged.
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.unsynced = 0
+        self.timer = None
+        # Held while the log is written, synced or replaced, since the
+        # timer syncs it from a thread of its own.
+        self.lock = Lock()
+        self.compacting = None
+        self.log = open(log_name(base, number), 'a', encoding = 'utf-8', newline = '\n')
+
+    def append(self, operation, *arguments):
+        'Logs one change to the knowledge base.'
+        with self.lock:
+            self.log.write(encode_record([operation] + list(arguments)))
+            self.log.flush()
+            self.unsynced += 1
+            if self.unsynced >= self.sync_every:
+                self.sync_log()
+            elif self.timer is None:
+                self.timer = Timer(self.sync_interval, self.sync_waiting)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self):
+        'Forces every logged change onto the disk.'
+        with self.lock:
+            self.sync_log()
+        self.finish_compaction()
+
+    def sync_waiting(self):
+        'Forces the records still waiting onto the disk, when the timer runs out.'
+        with self.lock:
+            self.sync_log()
+
+    def sync_log(self):
+        'Forces the log onto the disk; the caller holds the lock.'
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.log.closed: return
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.unsynced = 0
+
+    def compact(self):
+        """
+        Starts a new log and folds everything logged before it into a new
+        snapshot. Where the system can fork, the snapshot is written by a
+        child process while this one carries on. Returns False if a
+        compaction is already running or a batch is open.
+        """
+        self.finish_compaction()
+        if self.compacting is not None or getattr(self.kb, 'batch', None) is not None:
+            return False
+        with self.lock:
+            self.sync_log()
+            self.log.close()
+            self.number += 1
+            self.log = open(log_name(self.base, self.number), 'a', encoding = 'utf-8', newline = '\n')
+        if hasattr(os, 'fork'):
+            pid = os.fork()
+            if pid == 0:
+                # The child sees the knowledge base exactly as it was at the fork.
+                status = 1
+                try:
+                    write_snapshot(self.kb, self.base, self.number)
+                    status = 0
+                finally:
+                    os._exit(status)
+            self.compacting = (pid, self.number)
+        else:
+            write_snapshot(self.kb, self.base, self.number)
+            remove_old_files(self.base, self.number)
+        return True
+
+    def restart(self):
+        """
+        Starts a new log from a snapshot of the knowledge base as it is
+        now, as when the whole of it has just been replaced. Nothing logged
+        before is needed once the snapshot is on disk.
+        """
+        self.finish_compaction(wait = True)
+        with self.lock:
+            self.sync_log()
+            self.log.close()
+            self.number += 1
+            # Until the new snapshot is complete, recovery still finds the
+            # knowledge base as it was before it was replaced.
+            write_snapshot(self.kb, self.base, self.number)
+            self.log = open(log_name(self.base, self.number), 'a', encoding = 'utf-8', newline = '\n')
+        remove_old_files(self.base, self.number)
+
+    def finish_compaction(self, wait = False):
+        'Removes the files a finished compaction has made unnecessary.'
+        if self.compacting is None: return
+        pid, number = self.compacting
+        finished, status = os.waitpid(pid, 0 if wait else os.WNOHANG)
+        if finished == 0: return
+        self.compacting = None
+        if status == 0:
+            remove_old_files(self.base, number)
+
+    def close(self):
+        'Syncs and closes the journal, waiting for any compaction to finish.'
+        with self.lock:
+            self.sync_log()
+            self.log.close()
+        self.finish_compaction(wait = True)
+        if getattr(self.kb, 'journal', None) is self:
+            self.kb.journal = None
+
+def open_journal(kb, base, sync_every = 64, sync_interval = 1.0):
+    """
+    Recovers the knowledge base held by the module KB from the journal
+    BASE, then logs every further change to it. If there is no journal
+    yet, one is started from the current contents of the knowledge base.
+    """
+    snapshots = file_numbers(base, '.snap')
+    logs = file_numbers(base, '.log')
+    if snapshots == [] and logs == []:
+        write_snapshot(kb, base, 0)
+        snapshots = [0]
+    start = 0
+    if snapshots != []:
+        start = max(snapshots)
+        load_snapshot(kb, snapshot_name(base, start))
+    tail = [number for number in logs if number >= start]
+    for number in tail:
+        replay(kb, log_name(base, number), number == tail[-1])
+    remove_old_files(base, start)
+    journal = Journal(kb, base, max(tail + [start]), sync_every, sync_interval)
+    kb.journal = journal
+    return journal
+
+def replay(kb, filename, last):
+    'Applies the records in one log; a torn record is only allowed at the end of the LAST log.'
+    with open(filename, 'rb+') as log:
+        position = 0
+        for line in iter(log.readline, b''):
+            record = decode_record(line)
+            if record is None:
+                if not last:
+                    raise ValueError(filename + ' is damaged at offset ' + str(position))
+                # Whatever follows was never completely written; drop it.
+                log.truncate(position)
+                return
+            getattr(kb, OPERATIONS[record[0]])(*record[1:])
+            position = log.tell()
+
+def encode_record(record):
+    'Returns the line that logs RECORD.'
+    body = json.dumps(record)
+    return format(crc32(body.encode('utf-8')), '08x') + ' ' + body + '\n'
+
+def decode_record(line):
+    'Returns the record logged on the bytes LINE, or None if the line is incomplete or damaged.'
+    if not line.endswith(b'\n'): return None
+    checksum, _, body = line[:-1].partition(b' ')
+    if checksum != format(crc32(body), '08x').encode('ascii'): return None
+    try:
+        record = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(record, list) or record == [] or record[0] not in OPERATIONS:
+        return None
+    return record
+
+def write_snapshot(kb, base, number):
+    'Saves snapshot NUMBER so that it appears on disk complete or not at all.'
+    temporary = snapshot_name(base, number) + '.tmp'
+    save_snapshot(kb, temporary)
+    with open(temporary, 'rb') as snapshot:
+        os.fsync(snapshot.fileno())
+    os.replace(temporary, snapshot_name(base, number))
+
+def remove_old_files(base, number):
+    'Deletes the snapshots and logs that snapshot NUMBER makes unnecessary.'
+    for extension, name in (('.snap', snapshot_name), ('.log', log_name)):
+        for old in file_numbers(base, extension):
+            if old < number:
+                os.remove(name(base, old))
+
+def file_numbers(base, extension):
+    'Returns the numbers of the journal files with EXTENSION, in order.'
+    numbers = []
+    for filename in glob.glob(glob.escape(base) + '.*' + extension):
+        number = filename[len(base) + 1:-len(extension)]
+        if number.isdigit(): numbers.append(int(number))
+    return sorted(numbers)
+
+def snapshot_name(base, number):
+    'Returns the file name of snapshot NUMBER.'
+    return base + '.' + str(number) + '.snap'
+
+def log_name(base, number):
+    'Returns the file name of log NUMBER.'
+    return base + '.' + str(number) + '.log'
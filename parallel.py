@@ -0,0 +1,117 @@
+# parallel.py
+# Answers a large batch of questions against a knowledge base (Linneus3
+# or PlausibleArguments) on every core, with a pool of worker processes.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# The questions are cut into shards of consecutive sentences, and each
+# shard is answered by one worker as one conversation, so "Why?" still
+# refers to the question before it. Where the system can fork, the
+# workers are forked from this process and share its knowledge base
+# page for page until something writes to it, which nothing does: the
+# batch may only ask questions. Elsewhere each worker loads a snapshot,
+# which the operating system also shares between them.
+# Usage: python parallel.py <module> <snapshot> <questions file | -> [processes]
+
+from collections import deque
+from multiprocessing import get_all_start_methods, get_context
+from snapshot import save_snapshot, load_snapshot
+from store import WRITE_COMMANDS
+import gc
+import importlib
+import os
+import sys
+import tempfile
+
+# The knowledge base module the workers answer from.
+shared = None
+
+def answer_all(kb, sentences, processes = None, shard_size = 1000):
+    """
+    Yields the response to each of SENTENCES, in order, answered by
+    PROCESSES workers (by default, one per core) from the knowledge base
+    held by the module KB as it stands now.
+    """
+    global shared
+    processes = processes or os.cpu_count() or 1
+    if 'fork' in get_all_start_methods():
+        shared = kb
+        # Keep the collector from touching, and so copying, every object
+        # the workers inherit.
+        gc.freeze()
+        try:
+            with get_context('fork').Pool(processes) as pool:
+                yield from answer_shards(pool, shards(sentences, shard_size), processes)
+        finally:
+            gc.unfreeze()
+            shared = None
+        return
+    handle, filename = tempfile.mkstemp(suffix = '.snap')
+    os.close(handle)
+    try:
+        save_snapshot(kb, filename)
+        with get_context('spawn').Pool(processes, load_shared, (kb.__name__, filename)) as pool:
+            yield from answer_shards(pool, shards(sentences, shard_size), processes)
+    finally:
+        os.remove(filename)
+
+def answer_shards(pool, pending_shards, processes):
+    'Yields the responses to every shard, in order, keeping only a few shards in flight.'
+    waiting = deque()
+    for shard in pending_shards:
+        waiting.append(pool.apply_async(answer_shard, (shard,)))
+        if len(waiting) >= 4 * processes:
+            yield from waiting.popleft().get()
+    while waiting:
+        yield from waiting.popleft().get()
+
+def shards(sentences, shard_size):
+    'Yields lists of about SHARD_SIZE consecutive sentences, never cutting a "Why?" or "More." off from what it follows.'
+    shard = []
+    for sentence in sentences:
+        if len(shard) >= shard_size and sentence.strip().rstrip('?.!').lower() not in ('why', 'more'):
+            yield shard
+            shard = []
+        shard.append(sentence)
+    if shard != []:
+        yield shard
+
+def answer_shard(shard):
+    'Returns the responses to the sentences of one shard, answered as one conversation.'
+    session = shared.new_session()
+    responses = []
+    for info in shard:
+        command = shared.parse_command(info)
+        if command.kind in WRITE_COMMANDS:
+            responses.append("I can only answer questions in a batch like this.")
+        else:
+            responses.append(shared.answer_command(command, session))
+    return responses
+
+def load_shared(name, filename):
+    'Sets up a worker that was not forked: loads the snapshot FILENAME into the module NAME.'
+    global shared
+    shared = importlib.import_module(name)
+    load_snapshot(shared, filename)
+
+def main(arguments):
+    'Loads a snapshot into a module and answers a file of questions with every core.'
+    if len(arguments) not in (3, 4):
+        print('Usage: python parallel.py <module> <snapshot> <questions file | -> [processes]')
+        return
+    kb = importlib.import_module(arguments[0])
+    load_snapshot(kb, arguments[1])
+    processes = int(arguments[3]) if len(arguments) == 4 else None
+    questions = sys.stdin if arguments[2] == '-' else open(arguments[2])
+    output = open(sys.stdout.fileno(), 'w', buffering = 1 << 16,
+                  encoding = sys.stdout.encoding, closefd = False)
+    with questions, output:
+        sentences = (line.rstrip('\r\n') for line in questions)
+        for response in answer_all(kb, sentences, processes):
+            if response != "":
+                output.write(response)
+                output.write("\n")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
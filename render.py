@@ -0,0 +1,58 @@
+# render.py
+# Writes the explanations given by Linneus3 and PlausibleArguments.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Explanations are written piece by piece to a writer (anything with a
+# write method, such as an open file or an io.StringIO), so building one
+# takes time in proportion to its length, and a long one can be streamed
+# out as it is made. Very long lists are cut short: after MAX_SOURCES
+# names an explanation says "and 240 more sources", and of a chain of
+# more than MAX_LINKS links only the first and last are spelled out.
+# Both limits are read when an explanation is written, so they can be
+# changed (or set to None, to spell everything out) at any time.
+
+from io import StringIO
+
+MAX_SOURCES = 20
+MAX_LINKS = 50
+
+def render(write, *arguments):
+    'Returns what the function WRITE writes, given ARGUMENTS, as one string.'
+    out = StringIO()
+    write(out, *arguments)
+    return out.getvalue()
+
+def write_names(out, names, limit = None):
+    'Writes NAMES joined by "and", spelling out at most LIMIT (by default, MAX_SOURCES) of them.'
+    if limit is None: limit = MAX_SOURCES
+    if limit is None or len(names) <= limit:
+        out.write(' and '.join(names))
+        return
+    out.write(' and '.join(names[:limit]))
+    out.write(' and ' + str(len(names) - limit) + ' more sources')
+
+def write_says(out, names, limit = None):
+    'Writes "NAME says that " or "NAMES say that ".'
+    write_names(out, names, limit)
+    out.write(' says that ' if len(names) == 1 else ' say that ')
+
+def write_series(out, items, write_item, separator, last_separator, limit = None):
+    """
+    Writes each of ITEMS with WRITE_ITEM(out, item), with SEPARATOR between
+    them and LAST_SEPARATOR before the last. If there are more than LIMIT
+    (by default, MAX_LINKS), only the first and last LIMIT // 2 are
+    written, around a note of how many were left out.
+    """
+    if limit is None: limit = MAX_LINKS
+    count = len(items)
+    half = None if limit is None or count <= limit else max(limit // 2, 1)
+    for i in range(count):
+        if half is not None and half <= i < count - half:
+            if i == half:
+                out.write(separator + '(' + str(count - 2 * half) + ' more links)')
+            continue
+        if i > 0:
+            out.write(last_separator if i == count - 1 else separator)
+        write_item(out, items[i])
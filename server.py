@@ -0,0 +1,72 @@
+# server.py
+# Serves one knowledge base (Linneus3 or PlausibleArguments) to many
+# clients at once, over TCP or a Unix socket.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Each connection is a conversation of its own: the client sends one
+# sentence per line and gets back the response followed by an empty
+# line, and "Why?" refers to the last statement made on that connection.
+# Sentences are answered by a Store, so questions are answered side by
+# side in worker threads while a change has the knowledge base to itself.
+# Usage: python server.py <module> <port | socket path>
+
+from store import Store
+import asyncio
+import importlib
+import sys
+
+async def answer(store, command, session):
+    'Answers one parsed command in a worker thread of the STORE.'
+    return await asyncio.wrap_future(store.pool.submit(store.answer_command, command, session))
+
+async def serve_client(store, reader, writer):
+    'Holds the conversation on one connection until the client says bye or hangs up.'
+    session = store.kb.new_session()
+    try:
+        while True:
+            line = await reader.readline()
+            if line == b'': break
+            info = line.decode('utf-8', 'replace').strip()
+            if info == 'bye': break
+            if info == '': continue
+            try:
+                response = await answer(store, store.kb.parse_command(info), session)
+            except Exception as error:
+                response = 'Sorry, something went wrong: ' + str(error)
+            writer.write((response + '\n\n').encode('utf-8'))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(kb, port = None, path = None, host = 'localhost', workers = 4):
+    'Serves the knowledge base held by the module KB on PORT, or on the Unix socket PATH.'
+    store = Store(kb, workers)
+    try:
+        def connected(reader, writer):
+            return serve_client(store, reader, writer)
+        if path is not None:
+            server = await asyncio.start_unix_server(connected, path)
+        else:
+            server = await asyncio.start_server(connected, host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        store.close()
+
+def main(arguments):
+    'Serves the module named by the first argument on the port or socket path in the second.'
+    if len(arguments) != 2:
+        print('Usage: python server.py <module> <port | socket path>')
+        return
+    kb = importlib.import_module(arguments[0])
+    if arguments[1].isdigit():
+        asyncio.run(serve(kb, port = int(arguments[1])))
+    else:
+        asyncio.run(serve(kb, path = arguments[1]))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
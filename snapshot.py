@@ -0,0 +1,191 @@
+# snapshot.py
+# Saves and loads a knowledge base (the ISA, INCLUDES, ARTICLES and,
+# where present, QUALIFIERS and RELIABILITY dictionaries of Linneus3 or
+# PlausibleArguments) as a compact binary snapshot.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# Every string is stored once, in a table at the start of the file,
+# and everything after that refers to strings by their position in the
+# table. The file is laid out as a magic number followed by sections,
+# each one an 8-byte length and then its bytes:
+#  strings: the table, joined by NUL characters (padded to 4 bytes)
+#  ISA, INCLUDES: keys, offsets, values arrays
+#  ARTICLES: keys, values arrays
+#  QUALIFIERS, RELIABILITY: keys, subkeys, offsets, values arrays
+# All arrays hold little-endian 32-bit integers. A dictionary of lists
+# such as ('hawk' : ['raptor', 'bird']) becomes keys = [hawk],
+# offsets = [0, 2] and values = [raptor, bird]: the list for keys[i]
+# is values[offsets[i]:offsets[i + 1]]. The reachability index over ISA
+# is not saved at all: it would be far larger than the facts it is
+# worked out from, and is rebuilt from them on loading.
+
+# Loading is not a lookup in the file: every array is decoded into the
+# dictionaries the rest of the program reads, and the index and the
+# answer caches are rebuilt, so it takes time and memory in proportion
+# to the size of the knowledge base (about 2 seconds for 200000 facts).
+
+from array import array
+import sys
+
+from hierarchy import rebuild_index
+
+MAGIC = b'LINNSNP2'
+# The string table and then the arrays of ISA and INCLUDES (3 each),
+# ARTICLES (2), QUALIFIERS and RELIABILITY (4 each).
+SECTIONS = 17
+
+def save_snapshot(kb, filename):
+    'Writes the knowledge base held by the module KB to FILENAME.'
+    strings = {}
+    def intern(string):
+        try:
+            return strings[string]
+        except KeyError:
+            strings[string] = len(strings)
+            return strings[string]
+    sections = []
+    for lists in (kb.ISA, kb.INCLUDES):
+        sections += encode_lists(lists, intern)
+    sections.append(array('i', map(intern, kb.ARTICLES)))
+    sections.append(array('i', map(intern, kb.ARTICLES.values())))
+    for nested in (getattr(kb, 'QUALIFIERS', {}), getattr(kb, 'RELIABILITY', {})):
+        sections += encode_nested_lists(nested, intern)
+    table = '\0'.join(strings).encode('utf-8')
+    table += b'\0' * (-len(table) % 4)
+    with open(filename, 'wb') as snapshot:
+        snapshot.write(MAGIC)
+        write_section(snapshot, table)
+        for section in sections:
+            if sys.byteorder == 'big': section.byteswap()
+            write_section(snapshot, section.tobytes())
+
+def load_snapshot(kb, filename):
+    'Replaces the knowledge base held by the module KB with the one in FILENAME.'
+    with open(filename, 'rb') as snapshot:
+        view = memoryview(snapshot.read())
+    if view[:len(MAGIC)] != MAGIC:
+        raise ValueError(filename + ' is not a knowledge base snapshot')
+    sections = read_sections(view, len(MAGIC))
+    if len(sections) != SECTIONS:
+        raise ValueError(filename + ' has ' + str(len(sections)) + ' sections, not ' + str(SECTIONS))
+    strings = bytes(sections[0]).decode('utf-8').split('\0')
+    fill_knowledge_base(kb, strings, [read_array(section) for section in sections[1:]])
+
+def fill_knowledge_base(kb, strings, arrays):
+    'Rebuilds the dictionaries of the module KB from the snapshot arrays.'
+    # Everything is decoded (and so checked) before any dictionary of KB
+    # is touched, so a damaged snapshot leaves the knowledge base as it was.
+    decoded = {'ISA': dict(decode_lists(strings, *arrays[0:3])),
+               'INCLUDES': dict(decode_lists(strings, *arrays[3:6]))}
+    nouns, articles = arrays[6].tolist(), arrays[7].tolist()
+    check_strings(strings, nouns, articles)
+    if len(nouns) != len(articles):
+        raise ValueError('the snapshot has ' + str(len(nouns)) + ' nouns but ' +
+                         str(len(articles)) + ' articles')
+    decoded['ARTICLES'] = dict(zip(map(strings.__getitem__, nouns), map(strings.__getitem__, articles)))
+    for name, start in (('QUALIFIERS', 8), ('RELIABILITY', 12)):
+        if hasattr(kb, name):
+            nested = decoded[name] = {}
+            for key, subkey, values in decode_nested_lists(strings, *arrays[start:start + 4]):
+                nested.setdefault(key, {})[subkey] = values
+    # Facts nobody is named for share UNQUALIFIED, as they do when stored.
+    for qualifiers in decoded.get('QUALIFIERS', {}).values():
+        for subkey, values in qualifiers.items():
+            if values == []: qualifiers[subkey] = kb.UNQUALIFIED
+    for name, dictionary in decoded.items():
+        target = getattr(kb, name)
+        target.clear()
+        target.update(dictionary)
+    rebuild_index(kb)
+    if hasattr(kb, 'reindex_sources'):
+        kb.reindex_sources()
+    elif hasattr(kb, 'forget_answers'):
+        kb.forget_answers()
+
+def encode_lists(lists, intern):
+    'Returns the keys, offsets and values arrays for a dictionary of lists.'
+    keys = array('i')
+    offsets = array('i', [0])
+    values = array('i')
+    for key in lists:
+        keys.append(intern(key))
+        values.extend(map(intern, lists[key]))
+        offsets.append(len(values))
+    return [keys, offsets, values]
+
+def encode_nested_lists(nested, intern):
+    'Returns the keys, subkeys, offsets and values arrays for a dictionary of dictionaries of lists.'
+    keys = array('i')
+    subkeys = array('i')
+    offsets = array('i', [0])
+    values = array('i')
+    for key in nested:
+        for subkey in nested[key]:
+            keys.append(intern(key))
+            subkeys.append(intern(subkey))
+            values.extend(map(intern, nested[key][subkey]))
+            offsets.append(len(values))
+    return [keys, subkeys, offsets, values]
+
+def check_strings(strings, *arrays):
+    'Raises ValueError unless every integer in the lists ARRAYS is the position of one of STRINGS.'
+    for values in arrays:
+        if len(values) > 0 and (min(values) < 0 or max(values) >= len(strings)):
+            raise ValueError('the snapshot refers to a string it does not hold')
+
+def check_offsets(offsets, keys, values):
+    'Raises ValueError unless OFFSETS cut VALUES into one list for each of KEYS.'
+    if len(offsets) != len(keys) + 1 or offsets[0] != 0 or offsets[-1] != len(values) or\
+       any(offsets[i] > offsets[i + 1] for i in range(len(keys))):
+        raise ValueError('the snapshot\'s offsets do not fit its lists')
+
+def decode_lists(strings, keys, offsets, values):
+    'Yields (key, list) pairs from the arrays written by encode_lists.'
+    keys, offsets, values = keys.tolist(), offsets.tolist(), values.tolist()
+    check_strings(strings, keys, values)
+    check_offsets(offsets, keys, values)
+    named = list(map(strings.__getitem__, values))
+    for i, key in enumerate(keys):
+        yield strings[key], named[offsets[i]:offsets[i + 1]]
+
+def decode_nested_lists(strings, keys, subkeys, offsets, values):
+    'Yields (key, subkey, list) triples from the arrays written by encode_nested_lists.'
+    keys, subkeys, offsets, values = keys.tolist(), subkeys.tolist(), offsets.tolist(), values.tolist()
+    check_strings(strings, keys, subkeys, values)
+    check_offsets(offsets, keys, values)
+    if len(subkeys) != len(keys):
+        raise ValueError('the snapshot has ' + str(len(keys)) + ' keys but ' + str(len(subkeys)) + ' subkeys')
+    named = list(map(strings.__getitem__, values))
+    for i, key in enumerate(keys):
+        yield strings[key], strings[subkeys[i]], named[offsets[i]:offsets[i + 1]]
+
+def write_section(snapshot, data):
+    'Writes one length-prefixed section.'
+    snapshot.write(len(data).to_bytes(8, 'little'))
+    snapshot.write(data)
+
+def read_sections(view, position):
+    'Returns a view of every section in the file, without copying them.'
+    bounds = []
+    while position < len(view):
+        if position + 8 > len(view):
+            raise ValueError('the snapshot ends in the middle of a section length')
+        length = int.from_bytes(view[position:position + 8], 'little')
+        position += 8
+        if position + length > len(view):
+            raise ValueError('the snapshot ends in the middle of a section')
+        bounds.append((position, length))
+        position += length
+    return [view[start:start + length] for start, length in bounds]
+
+def read_array(section):
+    'Returns the integers held in one section.'
+    if len(section) % 4 != 0:
+        raise ValueError('a snapshot section is not a whole number of integers')
+    if sys.byteorder == 'little':
+        return section.cast('i')
+    values = array('i', section.tobytes())
+    values.byteswap()
+    return values
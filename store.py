@@ -0,0 +1,138 @@
+# store.py
+# Lets many threads share one knowledge base (Linneus3 or
+# PlausibleArguments): questions are answered side by side, while a
+# change has the knowledge base to itself.
+# This version runs under Python 3.x.
+
+# Ryan Chui & Megh Vakharia
+
+# The knowledge base itself lives in the globals of its module, so a
+# Store does not copy it; it only decides who may touch it when. For
+# example:
+#  store = Store(PlausibleArguments)
+#  store.ask('Jones says that a hawk is a bird.')
+#  answers = store.ask_all(['Is a hawk a bird?', 'Is a hawk a fish?'])
+# A sentence asked without a session is answered in a new one of its
+# own, so "Why?" and "More." only follow on from sentences asked in the
+# same session, and threads never share the console's.
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+
+# The kinds of command that change the knowledge base.
+WRITE_COMMANDS = {'assertion', 'reliability', 'minimize', 'begin_batch',
+                  'commit_batch', 'load', 'journal', 'compact',
+                  'keep_statistics'}
+
+class ReadWriteLock:
+    'Admits any number of readers or else one writer; a waiting writer holds off new readers.'
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writing = False
+        self.waiting_writers = 0
+
+    def acquire_read(self):
+        with self.condition:
+            self.condition.wait_for(lambda: not self.writing and self.waiting_writers == 0)
+            self.readers += 1
+
+    def release_read(self):
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0: self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            try:
+                self.condition.wait_for(lambda: not self.writing and self.readers == 0)
+            finally:
+                self.waiting_writers -= 1
+            self.writing = True
+
+    def release_write(self):
+        with self.condition:
+            self.writing = False
+            self.condition.notify_all()
+
+class Store:
+    'A knowledge base module shared by many threads, with a pool of its own for answering questions.'
+
+    def __init__(self, kb, workers = 4):
+        self.kb = kb
+        self.lock = ReadWriteLock()
+        self.pool = ThreadPoolExecutor(workers)
+
+    @contextmanager
+    def reading(self):
+        'Holds off changes to the knowledge base for the length of a with block.'
+        self.lock.acquire_read()
+        try:
+            yield self.kb
+        finally:
+            self.lock.release_read()
+
+    @contextmanager
+    def writing(self):
+        'Has the knowledge base to itself for the length of a with block.'
+        self.lock.acquire_write()
+        try:
+            yield self.kb
+        finally:
+            self.lock.release_write()
+
+    def answer_command(self, command, session = None):
+        'Returns the response to a parsed Command, as part of SESSION (by default, a new one), holding the lock its kind needs.'
+        if session is None: session = self.kb.new_session()
+        if command.kind in WRITE_COMMANDS:
+            with self.writing():
+                return self.kb.answer_command(command, session)
+        with self.reading():
+            return self.kb.answer_command(command, session)
+
+    def ask(self, info, session = None):
+        'Returns the response to one sentence, as part of SESSION (by default, a new one).'
+        return self.answer_command(self.kb.parse_command(info), session)
+
+    def submit(self, info, session = None):
+        'Starts answering one sentence in the pool and returns its Future.'
+        return self.pool.submit(self.ask, info, session)
+
+    def ask_all(self, sentences):
+        'Returns the responses to SENTENCES, answered side by side (each in a session of its own), in order.'
+        return list(self.pool.map(self.ask, sentences))
+
+    def isa_test(self, category1, category2):
+        'Returns True if category 1 is a category 2.'
+        with self.reading():
+            return self.kb.isa_test(category1, category2)
+
+    def find_chain(self, category1, category2):
+        'Returns the chain of links from category 1 up to category 2, or None.'
+        with self.reading():
+            return self.kb.find_chain(category1, category2)
+
+    def common_ancestors(self, categories):
+        'Returns the most specific categories that every one of CATEGORIES is.'
+        with self.reading():
+            return self.kb.common_ancestors(categories)
+
+    def isa_test_all(self, pairs):
+        'Returns isa_test for every (category 1, category 2) pair, answered side by side.'
+        return list(self.pool.map(lambda pair: self.isa_test(*pair), pairs))
+
+    def find_chain_all(self, pairs):
+        'Returns find_chain for every (category 1, category 2) pair, answered side by side.'
+        return list(self.pool.map(lambda pair: self.find_chain(*pair), pairs))
+
+    def store_isa_fact(self, category1, category2, *qualifier):
+        'Records that category 1 is a category 2 (according to QUALIFIER, where the module has them).'
+        with self.writing():
+            self.kb.store_isa_fact(category1, category2, *qualifier)
+
+    def close(self):
+        'Waits for the questions still being answered, then stops the pool.'
+        self.pool.shutdown()
@@ -0,0 +1,47 @@
+# test_batch.py
+# Checks that statements made in a batch end up as they would have one
+# at a time.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+import PlausibleArguments
+
+class PlausibleBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+
+    def tell(self, sentences):
+        return [PlausibleArguments.respond(sentence) for sentence in sentences]
+
+    def test_earlier_facts_are_kept(self):
+        self.tell(["A hawk is an animal.", "Begin a batch.", "Jones says that a hawk is a bird.",
+                   "A bird is an animal."])
+        self.assertEqual(self.tell(["Commit the batch."]), ["I stored 2 new statements."])
+        self.assertTrue(PlausibleArguments.isa_test1('hawk', 'animal'))
+        self.assertEqual(PlausibleArguments.respond("Is a hawk a bird?"), "Jones says that it is.")
+
+    def test_statements_are_checked_as_they_come(self):
+        self.tell(["A hawk is a bird.", "Begin a batch.", "A bird is an animal.",
+                   "Jones says that a hawk is an animal.", "A hawk is a hawk.", "A hawk is a bird."])
+        self.assertEqual(self.tell(["Commit the batch."]),
+                         ["I stored 1 new statements.\n1 of your statements repeated earlier ones.\n"
+                          "1 of your statements were trivially true.\n"
+                          "1 of your statements followed from earlier ones."])
+        self.assertFalse(PlausibleArguments.isa_test1('hawk', 'animal'))
+
+    def test_reliability_statements_are_accepted(self):
+        responses = self.tell(["Begin a batch.", "Jones says that a hawk is a bird.",
+                               "Smith says that Jones is an unreliable source."])
+        self.assertEqual(responses[1:], ["", ""])
+        self.tell(["Commit the batch."])
+        self.assertEqual(PlausibleArguments.RELIABILITY['Jones'], {'unreliable': ['Smith']})
+
+if __name__ == '__main__':
+    unittest.main()
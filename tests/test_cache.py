@@ -0,0 +1,65 @@
+# test_cache.py
+# Checks that a cached answer is given again only while nothing it rests
+# on has changed.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+import Linneus3
+import PlausibleArguments
+
+WHY = "Why is it possible that a hawk is an animal?"
+KEY = ('report_chain_with_qualifiers', 'hawk', 'animal')
+
+class AnswerCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        for sentence in ["Jones says that a hawk is a bird.", "A bird is an animal."]:
+            PlausibleArguments.respond(sentence)
+        self.first = PlausibleArguments.respond(WHY)
+
+    def test_clearing_forgets_answers(self):
+        clear_knowledge_base(PlausibleArguments)
+        self.assertEqual(PlausibleArguments.ANSWERS, {})
+        PlausibleArguments.respond("A hawk is a fish.")
+        self.assertEqual(PlausibleArguments.respond("Why is it possible that a hawk is a bird?"),
+                         "It is not possible.")
+        clear_knowledge_base(Linneus3)
+        Linneus3.respond("A hawk is a bird.")
+        Linneus3.respond("Why is a hawk a bird?")
+        clear_knowledge_base(Linneus3)
+        self.assertEqual(Linneus3.respond("Why is a hawk a bird?"), "But that's not true, as far as I know!")
+
+    def test_unrelated_changes_keep_the_answer(self):
+        stamp = PlausibleArguments.ANSWERS[KEY][0]
+        PlausibleArguments.respond("A dog is a mammal.")
+        PlausibleArguments.respond("Smith is a reliable source.")
+        self.assertEqual(PlausibleArguments.respond(WHY), self.first)
+        self.assertEqual(PlausibleArguments.ANSWERS[KEY][0], stamp)
+
+    def test_a_change_to_a_source_on_the_chain_is_seen(self):
+        PlausibleArguments.respond("Jones is an unreliable source.")
+        self.assertEqual(PlausibleArguments.respond(WHY), self.first +
+                         "\nHowever, Jones is an unreliable source,\n"
+                         "and therefore we cannot be certain about this chain of reasoning.")
+
+    def test_a_change_to_the_chain_is_seen(self):
+        PlausibleArguments.respond("Smith says that a bird is an animal.")
+        self.assertEqual(PlausibleArguments.respond(WHY), "Because Jones says that a hawk is a bird,\n"
+                                                          "and Smith says that a bird is an animal.")
+
+    def test_a_change_above_is_seen(self):
+        self.assertEqual(PlausibleArguments.respond("Why is it possible that a hawk is a creature?"),
+                         "It is not possible.")
+        PlausibleArguments.respond("An animal is a creature.")
+        self.assertTrue(PlausibleArguments.respond("Why is it possible that a hawk is a creature?")
+                        .startswith("Because Jones says that a hawk is a bird"))
+
+if __name__ == '__main__':
+    unittest.main()
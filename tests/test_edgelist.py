@@ -0,0 +1,50 @@
+# test_edgelist.py
+# Checks that an edge list comes back out of the knowledge base as it
+# went in.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+from edgelist import import_edges, export_edges
+import PlausibleArguments
+
+ROWS = ['hawk\tbird\ta\tJones', 'hawk\tanimal\ta\tSmith', 'bird\tanimal\ta\t']
+
+class RoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        self.directory = tempfile.mkdtemp()
+        self.edges = os.path.join(self.directory, 'edges.tsv')
+        with open(self.edges, 'w') as edges:
+            edges.write('\n'.join(ROWS) + '\n')
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_implied_facts_are_kept(self):
+        counts = import_edges(PlausibleArguments, self.edges)
+        self.assertEqual(counts['facts'], 3)
+        self.assertEqual(PlausibleArguments.SOURCE_FACTS['Smith'], {('hawk', 'animal')})
+        exported = os.path.join(self.directory, 'exported.tsv')
+        export_edges(PlausibleArguments, exported)
+        with open(exported) as edges:
+            rows = edges.read().splitlines()
+        for row in ROWS:
+            self.assertIn(row, rows)
+
+    def test_minimizing_is_asked_for(self):
+        counts = import_edges(PlausibleArguments, self.edges, minimize = True)
+        self.assertEqual(len(counts['batch']['redundant']), 1)
+        self.assertFalse(PlausibleArguments.isa_test1('hawk', 'animal'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# test_explanation.py
+# Checks that a long chain of reasoning, explained in part, still warns
+# about every unreliable source behind it.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+import PlausibleArguments
+import render
+
+class LongChainTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        for i in range(render.MAX_LINKS + 10):
+            source = 'Jones says that ' if i == render.MAX_LINKS // 2 + 5 else ''
+            PlausibleArguments.respond(source + 'A c' + str(i + 1) + ' is a c' + str(i) + '.')
+        PlausibleArguments.respond('Bob says that Jones is an unreliable source.')
+        self.question = 'Why is it possible that a c' + str(render.MAX_LINKS + 10) + ' is a c0?'
+
+    def test_elided_links_are_warned_about(self):
+        explanation = PlausibleArguments.respond(self.question)
+        self.assertNotIn('Jones says', explanation)
+        self.assertIn('Bob says that Jones is an unreliable source', explanation)
+
+    def test_limit_is_read_when_explaining(self):
+        limit = render.MAX_LINKS
+        render.MAX_LINKS = None
+        try:
+            explanation = PlausibleArguments.respond(self.question)
+        finally:
+            render.MAX_LINKS = limit
+        self.assertIn('Jones says', explanation)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# test_index.py
+# Checks the reachability index over ISA against a search of the ISA
+# lists, and that it stays small for a deep hierarchy.
+# Run with: python -m pytest tests
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base, generate
+import hierarchy
+import Linneus3
+import PlausibleArguments
+
+class IndexTest(unittest.TestCase):
+
+    def check_index(self, kb):
+        rng = random.Random(0)
+        for _ in range(50):
+            clear_knowledge_base(kb)
+            names = ['c' + str(i) for i in range(8)]
+            for _ in range(12):
+                category1, category2 = rng.sample(names, 2)
+                if category2 not in kb.get_isa_list(category1): kb.store_isa_fact(category1, category2)
+            for category1 in list(kb.ISA):
+                if rng.random() < 0.3 and kb.get_isa_list(category1):
+                    kb.remove_isa_fact(category1, kb.get_isa_list(category1)[0])
+            for category1 in names:
+                ancestors = hierarchy.search_ancestors(kb, category1)
+                for category2 in names:
+                    if category1 != category2:
+                        self.assertEqual(kb.isa_test(category1, category2), category2 in ancestors)
+
+    def test_linneus(self):
+        self.check_index(Linneus3)
+
+    def test_plausible_arguments(self):
+        self.check_index(PlausibleArguments)
+
+    def test_a_deep_chain_is_indexed_in_little_memory(self):
+        clear_knowledge_base(Linneus3)
+        for category1, category2 in generate('chain', 4000):
+            Linneus3.store_isa_fact(category1, category2)
+        self.assertTrue(Linneus3.isa_test('c3999', 'c0'))
+        # About a bit for each category above each category, where sets
+        # took some 48 bytes (over 300 megabytes in all).
+        self.assertLess(sum(sys.getsizeof(entry) for entry in Linneus3.ANCESTORS.values()), 4 * 10**6)
+
+if __name__ == '__main__':
+    unittest.main()
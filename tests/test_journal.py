@@ -0,0 +1,109 @@
+# test_journal.py
+# Checks that a knowledge base is recovered from its journal as it was
+# left: after a restart, after a crash that tore the last record, after
+# compaction, and after a snapshot was loaded into it.
+# Run with: python -m pytest tests
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+from journal import open_journal, file_numbers, log_name
+from snapshot import save_snapshot
+import PlausibleArguments
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        self.directory = tempfile.mkdtemp()
+        self.base = os.path.join(self.directory, 'kb')
+        self.journal = open_journal(PlausibleArguments, self.base)
+
+    def tearDown(self):
+        if PlausibleArguments.journal is not None:
+            PlausibleArguments.journal.close()
+        clear_knowledge_base(PlausibleArguments)
+        shutil.rmtree(self.directory)
+
+    def tell(self, *sentences):
+        for sentence in sentences:
+            PlausibleArguments.respond(sentence)
+
+    def state(self):
+        return ({category: list(parents) for category, parents in PlausibleArguments.ISA.items()},
+                {category: dict(sources) for category, sources in PlausibleArguments.QUALIFIERS.items()},
+                dict(PlausibleArguments.RELIABILITY))
+
+    def recover(self):
+        'Closes the journal, empties the knowledge base and recovers it from the journal.'
+        self.journal.close()
+        clear_knowledge_base(PlausibleArguments)
+        self.journal = open_journal(PlausibleArguments, self.base)
+
+    def test_changes_are_replayed(self):
+        self.tell("Jones says that a hawk is a bird.", "A bird is an animal.",
+                  "Smith says that Jones is a reliable source.")
+        state = self.state()
+        self.recover()
+        self.assertEqual(self.state(), state)
+        self.assertEqual(PlausibleArguments.respond("Is a hawk a bird?"), "Jones says that it is.")
+
+    def test_a_torn_record_is_dropped(self):
+        self.tell("A hawk is a bird.")
+        state = self.state()
+        self.journal.close()
+        log = log_name(self.base, self.journal.number)
+        size = os.path.getsize(log)
+        with open(log, 'ab') as torn:
+            torn.write(b'0badf00d ["isa", "bird", "anim')
+        clear_knowledge_base(PlausibleArguments)
+        self.journal = open_journal(PlausibleArguments, self.base)
+        self.assertEqual(self.state(), state)
+        self.assertEqual(os.path.getsize(log), size)
+
+    def test_a_damaged_earlier_log_is_refused(self):
+        self.tell("A hawk is a bird.")
+        self.journal.close()
+        with open(log_name(self.base, 0), 'ab') as damaged:
+            damaged.write(b'garbage\n')
+        with open(log_name(self.base, 1), 'w') as later:
+            pass
+        clear_knowledge_base(PlausibleArguments)
+        with self.assertRaises(ValueError):
+            open_journal(PlausibleArguments, self.base)
+        self.journal = None
+
+    def test_compaction_keeps_everything(self):
+        self.tell("A hawk is a bird.", "Jones says that a bird is an animal.")
+        self.assertTrue(self.journal.compact())
+        self.tell("A dog is an animal.")
+        self.journal.finish_compaction(wait = True)
+        self.assertEqual(file_numbers(self.base, '.snap'), [1])
+        self.assertEqual(file_numbers(self.base, '.log'), [1])
+        state = self.state()
+        self.recover()
+        self.assertEqual(self.state(), state)
+
+    def test_a_loaded_snapshot_is_recovered(self):
+        other = os.path.join(self.directory, 'other.snap')
+        self.journal.close()
+        self.tell("A cat is an animal.")
+        save_snapshot(PlausibleArguments, other)
+        clear_knowledge_base(PlausibleArguments)
+        self.journal = open_journal(PlausibleArguments, self.base)
+        self.tell("Jones says that a hawk is a bird.",
+                  "Load the knowledge base from " + other + ".", "A dog is an animal.")
+        self.journal = PlausibleArguments.journal
+        state = self.state()
+        self.assertEqual(state[0], {'cat': ['animal'], 'dog': ['animal']})
+        self.recover()
+        self.assertEqual(self.state(), state)
+
+if __name__ == '__main__':
+    unittest.main()
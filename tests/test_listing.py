@@ -0,0 +1,42 @@
+# test_listing.py
+# Checks that a listing given a page at a time can be carried on after
+# the knowledge base has changed.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+import hierarchy
+import Linneus3
+import PlausibleArguments
+
+class ChangedListingTest(unittest.TestCase):
+
+    def check_listing(self, kb):
+        clear_knowledge_base(kb)
+        for sentence in ["A hawk is an animal.", "A dog is an animal.", "A cat is an animal.",
+                         "A trout is an animal."]:
+            kb.respond(sentence)
+        page_size = hierarchy.PAGE_SIZE
+        hierarchy.PAGE_SIZE = 2
+        try:
+            session = kb.new_session()
+            self.assertTrue(kb.respond("What are all the kinds of animal?", session).endswith('(Say "More." to hear the rest.)'))
+            kb.respond("A hen is an animal.", session)
+            kb.respond("A puppy is a dog.", session)
+            self.assertEqual(kb.respond("More.", session), "More kinds of animal: a cat, a trout.")
+        finally:
+            hierarchy.PAGE_SIZE = page_size
+
+    def test_linneus(self):
+        self.check_listing(Linneus3)
+
+    def test_plausible_arguments(self):
+        self.check_listing(PlausibleArguments)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# test_redundancy.py
+# Checks that removing redundant facts never loses an ISA relationship,
+# in particular when supercategories lie on a cycle.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+import Linneus3
+import PlausibleArguments
+import render
+
+class IndirectRedundancyTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(Linneus3)
+
+    def test_parents_on_a_cycle_keep_one_link(self):
+        for sentence in ["A c2 is a c0.", "A c0 is a c1.", "A c4 is a c2.",
+                         "A c4 is a c1.", "A c1 is a c2."]:
+            Linneus3.respond(sentence)
+        self.assertEqual(len(Linneus3.get_isa_list('c4')), 1)
+        for category in ('c0', 'c1', 'c2'):
+            self.assertTrue(Linneus3.isa_test('c4', category))
+
+class MinimizeTest(unittest.TestCase):
+
+    def check_cycle_batch(self, kb):
+        clear_knowledge_base(kb)
+        for sentence in ["Begin a batch.", "A x is an a.", "A x is a b.", "An a is a b.",
+                         "A b is an a.", "Commit the batch.", "Minimize the knowledge base."]:
+            kb.respond(sentence)
+        self.assertEqual(len(kb.get_isa_list('x')), 1)
+        self.assertTrue(kb.isa_test('x', 'a'))
+        self.assertTrue(kb.isa_test('x', 'b'))
+        # INCLUDES still holds every fact ISA does, the other way round.
+        self.assertEqual(sorted((child, parent) for parent in kb.INCLUDES for child in kb.INCLUDES[parent]),
+                         sorted((child, parent) for child in kb.ISA for parent in kb.ISA[child]))
+
+    def test_linneus(self):
+        self.check_cycle_batch(Linneus3)
+
+    def test_plausible_arguments(self):
+        self.check_cycle_batch(PlausibleArguments)
+
+class RemovedLinksReportTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        PlausibleArguments.respond("Begin a batch.")
+        for i in range(render.MAX_SOURCES + 5):
+            PlausibleArguments.respond("source" + str(i) + " says that a hawk is an animal.")
+        for sentence in ["Jones says that a hawk is a bird.", "A bird is an animal.",
+                         "Commit the batch."]:
+            PlausibleArguments.respond(sentence)
+
+    def test_sources_are_cut_short(self):
+        names = " and ".join("source" + str(i) for i in range(render.MAX_SOURCES))
+        self.assertEqual(PlausibleArguments.respond("Minimize the knowledge base."),
+                         "The following statements were redundant and have been removed:\n" +
+                         names + " and 5 more sources say that a hawk is an animal.")
+
+if __name__ == '__main__':
+    unittest.main()
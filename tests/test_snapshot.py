@@ -0,0 +1,63 @@
+# test_snapshot.py
+# Checks that a damaged snapshot is refused without touching the
+# knowledge base it was to be loaded into.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+from snapshot import save_snapshot, load_snapshot
+import PlausibleArguments
+
+class DamagedSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        for sentence in ["A hawk is a bird.", "Jones says that a bird is an animal.",
+                         "Smith says that Jones is a reliable source."]:
+            PlausibleArguments.respond(sentence)
+        handle, self.filename = tempfile.mkstemp(suffix = '.snap')
+        os.close(handle)
+        save_snapshot(PlausibleArguments, self.filename)
+        with open(self.filename, 'rb') as snapshot:
+            self.data = snapshot.read()
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_facts_can_be_removed_after_loading(self):
+        stored = {category: list(parents) for category, parents in PlausibleArguments.ISA.items()}
+        load_snapshot(PlausibleArguments, self.filename)
+        self.assertEqual(PlausibleArguments.ISA, stored)
+        self.assertIs(PlausibleArguments.QUALIFIERS['hawk']['bird'], PlausibleArguments.UNQUALIFIED)
+        PlausibleArguments.remove_isa_fact('bird', 'animal')
+        self.assertFalse(PlausibleArguments.isa_test('hawk', 'animal'))
+
+    def test_the_index_is_rebuilt_on_loading(self):
+        clear_knowledge_base(PlausibleArguments)
+        load_snapshot(PlausibleArguments, self.filename)
+        self.assertTrue(PlausibleArguments.isa_test('hawk', 'animal'))
+        self.assertEqual(PlausibleArguments.common_ancestors(['hawk', 'bird']), ['bird'])
+
+    def test_truncated_snapshots_are_refused(self):
+        for length in range(0, len(self.data), 7):
+            with open(self.filename, 'wb') as snapshot:
+                snapshot.write(self.data[:length])
+            with self.assertRaises(ValueError):
+                load_snapshot(PlausibleArguments, self.filename)
+            self.assertTrue(PlausibleArguments.isa_test('hawk', 'animal'))
+
+    def test_load_command_reports_the_failure(self):
+        with open(self.filename, 'wb') as snapshot:
+            snapshot.write(self.data[:len(self.data) // 2])
+        self.assertEqual(PlausibleArguments.respond("Load the knowledge base from " + self.filename + "."),
+                         "I could not load a knowledge base from " + self.filename + ".")
+        self.assertEqual(PlausibleArguments.respond("Is a bird an animal?"), "Jones says that it is.")
+
+if __name__ == '__main__':
+    unittest.main()
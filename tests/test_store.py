@@ -0,0 +1,38 @@
+# test_store.py
+# Checks that sentences asked of a Store without a session do not follow
+# on from one another, or from the console's.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmark import clear_knowledge_base
+from store import Store
+import PlausibleArguments
+
+class SessionTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_knowledge_base(PlausibleArguments)
+        self.store = Store(PlausibleArguments)
+        self.store.ask_all(['A hawk is a bird.', 'A bird is an animal.'])
+
+    def tearDown(self):
+        self.store.pool.shutdown()
+
+    def test_sentences_without_a_session_stand_alone(self):
+        PlausibleArguments.respond('Is a hawk an animal?')
+        self.store.ask('Is a hawk an animal?')
+        self.assertTrue(self.store.ask('Why?').startswith('I do not understand.'))
+        self.assertTrue(PlausibleArguments.respond('Why?').startswith('Because a hawk is a bird'))
+
+    def test_a_session_follows_on(self):
+        session = PlausibleArguments.new_session()
+        self.store.ask('Is a hawk an animal?', session)
+        self.assertTrue(self.store.ask('Why?', session).startswith('Because a hawk is a bird'))
+
+if __name__ == '__main__':
+    unittest.main()